@@ -2,10 +2,27 @@
 Flask Application with WebSocket Support
 Main entry point for Worker Stress Analysis System backend
 """
+import os
+import config  # settings only (os/pathlib), imports no numeric library
+
+# Pin PyTorch to one intra-op thread before numpy, OpenCV or any model is imported. Inference
+# runs on eventlet's native thread pool, so per-op OpenMP/MKL workers would only oversubscribe
+os.environ.setdefault('OMP_NUM_THREADS', str(config.TORCH_NUM_THREADS))
+import torch
+torch.set_num_threads(config.TORCH_NUM_THREADS)
+torch.set_num_interop_threads(config.TORCH_NUM_THREADS)
+
+import socket
+import eventlet
+import eventlet.wsgi
 from flask import Flask, request, jsonify
 from flask_socketio import SocketIO, emit
 from flask_cors import CORS
-import config
+from utils import setup_logging
+
+# Log through a queue drained by a background thread, configured before models log their setup
+setup_logging()
+
 from websocket_handler import WebSocketHandler
 
 # Initialize Flask app
@@ -15,15 +32,17 @@ app.config['SECRET_KEY'] = 'worker-stress-analysis-secret-key'
 # Enable CORS
 CORS(app, resources={r"/*": {"origins": config.CORS_ORIGINS}})
 
-# Initialize SocketIO
-socketio = SocketIO(app, cors_allowed_origins=config.CORS_ORIGINS, async_mode='eventlet')
+# Initialize SocketIO (MessagePack packets; the client must use the matching parser)
+socketio = SocketIO(
+    app,
+    cors_allowed_origins=config.CORS_ORIGINS,
+    async_mode='eventlet',
+    serializer=config.SOCKET_SERIALIZER
+)
 
 # Initialize WebSocket handler
 ws_handler = WebSocketHandler()
 
-# Store session mappings (SID -> session_id)
-session_mappings = {}
-
 
 # ===== HTTP Routes =====
 
@@ -130,66 +149,62 @@ def get_model_architecture():
     })
 
 
+@app.route('/api/stats/prediction_cache')
+def get_prediction_cache_stats():
+    """Get emotion prediction cache hit/miss counters"""
+    return jsonify(ws_handler.get_cache_stats())
+
+
 # ===== WebSocket Events =====
 
 @socketio.on('connect')
 def handle_connect():
     """Handle client connection"""
     sid = request.sid
-    session_id = ws_handler.handle_connect(sid)
-    session_mappings[sid] = session_id
-    print(f"Client connected: {sid}")
+    ws_handler.handle_connect(sid)
 
 
 @socketio.on('disconnect')
 def handle_disconnect():
     """Handle client disconnection"""
     sid = request.sid
-    session_id = session_mappings.get(sid)
-    ws_handler.handle_disconnect(sid, session_id)
-    if sid in session_mappings:
-        del session_mappings[sid]
-    print(f"Client disconnected: {sid}")
+    ws_handler.handle_disconnect(sid)
 
 
 @socketio.on('audio_chunk')
 def handle_audio_chunk(data):
     """Process audio chunk"""
-    sid = request.sid
-    data['session_id'] = session_mappings.get(sid)
-    ws_handler.handle_audio_chunk(data)
+    ws_handler.handle_audio_chunk(request.sid, data)
 
 
 @socketio.on('video_frame')
 def handle_video_frame(data):
     """Process video frame"""
-    sid = request.sid
-    data['session_id'] = session_mappings.get(sid)
-    ws_handler.handle_video_frame(data)
+    ws_handler.handle_video_frame(request.sid, data)
 
 
 @socketio.on('fusion_request')
 def handle_fusion_request(data):
     """Perform multimodal fusion"""
-    sid = request.sid
-    data['session_id'] = session_mappings.get(sid)
-    ws_handler.handle_fusion_request(data)
+    ws_handler.handle_fusion_request(request.sid, data)
+
+
+@socketio.on('multimodal')
+def handle_multimodal(data):
+    """Process audio and video together and emit the fused result"""
+    ws_handler.handle_multimodal(request.sid, data)
 
 
 @socketio.on('get_session_info')
 def handle_get_session_info(data):
     """Get session information"""
-    sid = request.sid
-    data['session_id'] = session_mappings.get(sid)
-    ws_handler.handle_get_session_info(data)
+    ws_handler.handle_get_session_info(request.sid, data)
 
 
 @socketio.on('get_timeline')
 def handle_get_timeline(data):
     """Get timeline data"""
-    sid = request.sid
-    data['session_id'] = session_mappings.get(sid)
-    ws_handler.handle_get_timeline(data)
+    ws_handler.handle_get_timeline(request.sid, data)
 
 
 # ===== Main =====
@@ -203,9 +218,18 @@ if __name__ == '__main__':
     print(f'Debug: {config.DEBUG}')
     print('='*60)
     
-    socketio.run(
-        app,
-        host=config.HOST,
-        port=config.PORT,
-        debug=config.DEBUG
-    )
+    if config.SOCKET_TCP_NODELAY:
+        # Disable Nagle's algorithm so small Socket.IO frames go out immediately.
+        # Accepted connections inherit TCP_NODELAY from the listening socket.
+        # Tradeoff: more small packets on the wire in exchange for lower latency.
+        app.debug = config.DEBUG
+        listener = eventlet.listen((config.HOST, config.PORT))
+        listener.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        eventlet.wsgi.server(listener, app, log_output=config.DEBUG)
+    else:
+        socketio.run(
+            app,
+            host=config.HOST,
+            port=config.PORT,
+            debug=config.DEBUG
+        )
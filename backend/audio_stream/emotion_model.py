@@ -2,17 +2,23 @@
 Audio Emotion Model
 CNN-LSTM model for speech emotion recognition
 """
+import logging
+import threading
 import numpy as np
 import torch
 import torch.nn as nn
 import config
+from utils.onnx_export import ort, create_session, export_onnx, is_stale, quantize_int8_dynamic
+from utils.torch_utils import cpu_supports_bf16
+
+log = logging.getLogger(__name__)
 
 
 class AudioEmotionCNN_LSTM(nn.Module):
     """
     CNN-LSTM architecture for audio emotion recognition
     Input: MFCC features (time_frames, mfcc_features)
-    Output: Emotion probabilities (7 classes)
+    Output: Emotion logits (7 classes), softmax is applied by AudioEmotionModel
     """
     
     def __init__(self, input_dim=39, hidden_dim=128, num_classes=7):
@@ -53,7 +59,6 @@ class AudioEmotionCNN_LSTM(nn.Module):
         self.fc1 = nn.Linear(hidden_dim * 2, 64)  # *2 for bidirectional
         self.dropout = nn.Dropout(0.5)
         self.fc2 = nn.Linear(64, num_classes)
-        self.softmax = nn.Softmax(dim=1)
         
     def forward(self, x):
         """
@@ -63,7 +68,7 @@ class AudioEmotionCNN_LSTM(nn.Module):
             x: Input tensor of shape (batch, time_frames, features)
             
         Returns:
-            Emotion probabilities (batch, num_classes)
+            Emotion logits (batch, num_classes)
         """
         # Transpose for Conv1d: (batch, features, time)
         x = x.transpose(1, 2)
@@ -85,7 +90,6 @@ class AudioEmotionCNN_LSTM(nn.Module):
         x = self.fc1(x)
         x = self.dropout(x)
         x = self.fc2(x)
-        x = self.softmax(x)
         
         return x
 
@@ -102,26 +106,171 @@ class AudioEmotionModel:
             device: 'cpu' or 'cuda'
         """
         self.device = torch.device(device)
+        self._labels = tuple(config.EMOTION_LABELS)
+        self.target_length = 100  # Model input frames (inputs are zero-padded or truncated)
         self.model = AudioEmotionCNN_LSTM(
             input_dim=39,  # 13 MFCC + 13 delta + 13 delta2
             hidden_dim=128,
-            num_classes=len(config.EMOTION_LABELS)
+            num_classes=len(self._labels)
         ).to(self.device)
         
         # Load pre-trained weights if available
         if model_path and model_path.exists():
             try:
                 self.model.load_state_dict(torch.load(model_path, map_location=self.device))
-                print(f"Loaded audio emotion model from {model_path}")
+                log.info("Loaded audio emotion model from %s", model_path)
             except Exception as e:
-                print(f"Could not load model weights: {e}")
-                print("Using randomly initialized weights (for demo purposes)")
+                log.warning("Could not load model weights: %s", e)
+                log.warning("Using randomly initialized weights (for demo purposes)")
         else:
-            print("No pre-trained model found. Using randomly initialized weights.")
-            print("Note: In production, you should train or download a pre-trained model.")
+            log.warning("No pre-trained model found. Using randomly initialized weights.")
+            log.warning("Note: In production, you should train or download a pre-trained model.")
         
         self.model.eval()  # Set to evaluation mode
+        self.model.requires_grad_(False)  # Inference only, no grad bookkeeping on parameters
+        
+        # Serve through ONNX Runtime (dynamic INT8 if AUDIO_MODEL_QUANTIZE)
+        self.session = None
+        if config.AUDIO_MODEL_ONNX and self.device.type == 'cpu':
+            self.session = self._load_onnx_session(model_path)
+        
+        # Reduced precision: FP16 weights on CUDA, BF16 autocast on CPU (if not quantized and
+        # the CPU has native BF16; emulated BF16 is slower than FP32)
+        self._input_dtype = torch.float32
+        self._autocast_dtype = None
+        if self.session is None and config.AUDIO_MODEL_HALF_PRECISION:
+            if self.device.type == 'cuda':
+                self.model = self.model.half()
+                self._input_dtype = torch.float16
+            elif not config.AUDIO_MODEL_QUANTIZE and cpu_supports_bf16():
+                self._autocast_dtype = torch.bfloat16
+        
+        # Per-thread reusable single-sample buffers (input, ORT IOBinding); predictions run
+        # concurrently on the server's thread pool, so each thread gets its own
+        self._staging = threading.local()
+        
+        # Quantize LSTM/Linear layers to INT8 for faster CPU inference
+        if self.session is None and config.AUDIO_MODEL_QUANTIZE and self.device.type == 'cpu':
+            self.model = self._quantize_dynamic(self.model)
+        
+        # Compile to a frozen TorchScript module to cut Python dispatch overhead
+        if self.session is None and config.AUDIO_MODEL_JIT:
+            self.model = self._script_for_inference(self.model)
+        
+    def _load_onnx_session(self, model_path):
+        """
+        Export the model to ONNX (quantizing it if configured) and open an inference session
+        
+        Args:
+            model_path: Path to the PyTorch weights the ONNX graph is built from
+            
+        Returns:
+            onnxruntime.InferenceSession, or None to keep using PyTorch
+        """
+        if ort is None:
+            log.warning("onnxruntime not installed, using PyTorch audio model")
+            return None
+        
+        try:
+            fp32_path = config.AUDIO_ONNX_PATH
+            int8_path = config.AUDIO_ONNX_INT8_PATH
+            
+            if is_stale(fp32_path, __file__, config.__file__, model_path):
+                export_onnx(self.model, fp32_path, torch.zeros(1, self.target_length, 39))
+            
+            onnx_path = fp32_path
+            if config.AUDIO_MODEL_QUANTIZE:
+                if not is_stale(int8_path, fp32_path) or quantize_int8_dynamic(fp32_path, int8_path):
+                    onnx_path = int8_path
+            
+            session = create_session(onnx_path)
+            
+            # Warm up so kernel selection doesn't land on the first real chunk
+            session.run(None, {'x': np.zeros((1, self.target_length, 39), dtype=np.float32)})
+            
+            log.info("Serving audio emotion model with ONNX Runtime from %s", onnx_path)
+            return session
+        except Exception as e:
+            log.warning("ONNX Runtime setup failed, using PyTorch audio model: %s", e)
+            return None
+        
+    def _quantize_dynamic(self, model):
+        """
+        Apply dynamic INT8 quantization to LSTM and Linear layers
+        Conv1d/BatchNorm layers stay in FP32 (not covered by dynamic quantization)
+        
+        Args:
+            model: Eval-mode FP32 model
+            
+        Returns:
+            Quantized model, or the original model if quantization is unavailable
+        """
+        engines = torch.backends.quantized.supported_engines
+        if 'fbgemm' in engines:
+            torch.backends.quantized.engine = 'fbgemm'  # x86
+        elif 'qnnpack' in engines:
+            torch.backends.quantized.engine = 'qnnpack'  # ARM
+        else:
+            log.warning("No quantized engine available, keeping FP32 audio model")
+            return model
+        
+        try:
+            return torch.quantization.quantize_dynamic(
+                model,
+                {nn.LSTM, nn.Linear},
+                dtype=torch.qint8
+            )
+        except Exception as e:
+            log.warning("Dynamic quantization failed, keeping FP32 audio model: %s", e)
+            return model
+    
+    def _script_for_inference(self, model):
+        """
+        Script, freeze and optimize the model for inference
+        Freezing inlines weights as constants and lets Conv-BN-ReLU sequences fuse
+        
+        Args:
+            model: Eval-mode model (FP32 or dynamically quantized)
+            
+        Returns:
+            Frozen TorchScript module, or the eager model if scripting fails
+        """
+        try:
+            scripted = torch.jit.script(model)
+            scripted = torch.jit.freeze(scripted)
+            scripted = torch.jit.optimize_for_inference(scripted)
+            
+            # Scripted quantized modules can fail at run time, so verify once
+            with torch.inference_mode():
+                scripted(torch.zeros(1, self.target_length, 39, device=self.device, dtype=self._input_dtype))
+            
+            return scripted
+        except Exception as e:
+            log.warning("TorchScript compilation failed, using eager audio model: %s", e)
+            return model
+        
+    def _single_buffers(self):
+        """
+        Get this thread's single-sample inference buffers, allocating them on first use
+        With ONNX Runtime the input tensor's memory and an output array are bound to an
+        IOBinding, so per-chunk runs don't allocate
+        
+        Returns:
+            Tuple of (input tensor (1, frames, features), io_binding or None, output array or None)
+        """
+        buffers = getattr(self._staging, 'buffers', None)
+        if buffers is None:
+            buf = torch.zeros(1, self.target_length, 39, device=self.device, dtype=self._input_dtype)
+            binding = out = None
+            if self.session is not None:
+                out = np.zeros((1, len(self._labels)), dtype=np.float32)
+                binding = self.session.io_binding()
+                binding.bind_ortvalue_input('x', ort.OrtValue.ortvalue_from_numpy(buf.numpy()))
+                binding.bind_ortvalue_output('y', ort.OrtValue.ortvalue_from_numpy(out))
+            buffers = self._staging.buffers = (buf, binding, out)
         
+        return buffers
+    
     def predict(self, feature_vector):
         """
         Predict emotion from audio features
@@ -132,49 +281,90 @@ class AudioEmotionModel:
         Returns:
             Tuple of (predicted_emotion, probabilities, confidence)
         """
-        with torch.no_grad():
-            # Convert to tensor and add batch dimension
-            x = torch.FloatTensor(feature_vector).unsqueeze(0).to(self.device)
+        with torch.inference_mode():
+            # Copy into this thread's preallocated buffer, zero-padding or truncating to fixed length
+            buf, binding, out = self._single_buffers()
+            t = min(feature_vector.shape[0], self.target_length)
+            buf.zero_()
+            buf[0, :t].copy_(torch.from_numpy(feature_vector[:t]))
             
-            # Pad or truncate to fixed length (e.g., 100 frames)
-            target_length = 100
-            if x.shape[1] < target_length:
-                # Pad with zeros
-                padding = torch.zeros(1, target_length - x.shape[1], x.shape[2], device=self.device)
-                x = torch.cat([x, padding], dim=1)
-            elif x.shape[1] > target_length:
-                # Truncate
-                x = x[:, :target_length, :]
+            # Forward pass (ONNX Runtime reads buf and writes out through the binding)
+            if self.session is not None:
+                self.session.run_with_iobinding(binding)
+                logits = torch.from_numpy(out[0])
+            else:
+                logits = self._forward(buf)[0]
             
-            # Forward pass
-            probabilities = self.model(x)
+            # Probabilities stay a float32 array; clients get a list/dict built at emit time
+            probabilities = torch.softmax(logits, dim=0).cpu().numpy()
             
-            # Get prediction
-            probs_np = probabilities.cpu().numpy()[0]
-            predicted_idx = np.argmax(probs_np)
-            predicted_emotion = config.EMOTION_LABELS[predicted_idx]
-            confidence = float(probs_np[predicted_idx])
+            return self._format_prediction(probabilities)
+    
+    def predict_batch(self, feature_vectors):
+        """
+        Predict emotions for a batch of feature vectors in a single forward pass
+        
+        Args:
+            feature_vectors: List of numpy arrays of shape (time_frames, features)
             
-            # Convert probabilities to dictionary
-            prob_dict = {
-                emotion: float(prob)
-                for emotion, prob in zip(config.EMOTION_LABELS, probs_np)
-            }
+        Returns:
+            List of (predicted_emotion, probabilities, confidence) tuples
+        """
+        if not feature_vectors:
+            return []
+        
+        # A lone chunk takes the single-sample path and its reusable buffers
+        if len(feature_vectors) == 1:
+            return [self.predict(feature_vectors[0])]
+        
+        with torch.inference_mode():
+            # Stack padded/truncated inputs into one (N, 100, 39) tensor
+            x = torch.zeros(
+                len(feature_vectors), self.target_length, 39,
+                device=self.device, dtype=self._input_dtype
+            )
+            for i, fv in enumerate(feature_vectors):
+                t = min(fv.shape[0], self.target_length)
+                x[i, :t].copy_(torch.from_numpy(fv[:t]))
+            
+            # Forward pass
+            if self.session is not None:
+                logits = torch.from_numpy(self.session.run(None, {'x': x.numpy()})[0])
+            else:
+                logits = self._forward(x)
+            probabilities = torch.softmax(logits, dim=1).cpu().numpy()
             
-            return predicted_emotion, prob_dict, confidence
+            return [self._format_prediction(probs) for probs in probabilities]
     
-    def predict_batch(self, feature_vectors):
+    def _forward(self, x):
+        """
+        Run the model, under autocast if configured
+        
+        Args:
+            x: Input tensor of shape (batch, time_frames, features)
+            
+        Returns:
+            FP32 logits (batch, num_classes)
         """
-        Predict emotions for a batch of feature vectors
+        if self._autocast_dtype is None:
+            return self.model(x).float()
+        
+        with torch.autocast(device_type=self.device.type, dtype=self._autocast_dtype):
+            return self.model(x).float()
+    
+    def _format_prediction(self, probs):
+        """
+        Convert a probability vector into a prediction tuple
         
         Args:
-            feature_vectors: List of numpy arrays
+            probs: Float32 array of num_classes probabilities
             
         Returns:
-            List of predictions
+            Tuple of (predicted_emotion, probabilities, confidence); probabilities is the
+            array itself, ordered as config.EMOTION_LABELS
         """
-        predictions = []
-        for fv in feature_vectors:
-            pred = self.predict(fv)
-            predictions.append(pred)
-        return predictions
+        predicted_idx = int(np.argmax(probs))
+        predicted_emotion = self._labels[predicted_idx]
+        confidence = float(probs[predicted_idx])
+        
+        return predicted_emotion, probs, confidence
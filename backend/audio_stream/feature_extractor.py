@@ -2,21 +2,37 @@
 Audio Feature Extractor
 Extracts acoustic features from preprocessed audio
 """
+import logging
 import numpy as np
 import librosa
+from scipy import signal
 import config
+from .feature_kernels import frame_stats, frame_summary, frame_periodicity
+
+log = logging.getLogger(__name__)
 
 
 class AudioFeatureExtractor:
     """Extracts multiple acoustic features from audio signals"""
     
-    def __init__(self, sample_rate=config.AUDIO_SAMPLE_RATE):
+    def __init__(self, sample_rate=config.AUDIO_SAMPLE_RATE, fast_pitch=True):
+        """
+        Args:
+            sample_rate: Audio sample rate in Hz
+            fast_pitch: Use YIN for pitch (real-time); False uses PYIN (offline analysis)
+        """
         self.sample_rate = sample_rate
+        self.fast_pitch = fast_pitch
         self.n_mfcc = config.MFCC_N_COEFF
         self.n_fft = config.MFCC_N_FFT
         self.hop_length = config.MFCC_HOP_LENGTH
         self.fmin = config.PITCH_FMIN
         self.fmax = config.PITCH_FMAX
+        self.voicing_threshold = config.PITCH_VOICING_THRESHOLD
+        
+        # Precompute STFT window and mel filterbank once (reused for every chunk)
+        self._window = signal.get_window('hann', self.n_fft)
+        self._mel = librosa.filters.mel(sr=sample_rate, n_fft=self.n_fft, n_mels=128)
         
     def extract_features(self, audio_frame):
         """
@@ -30,42 +46,58 @@ class AudioFeatureExtractor:
         """
         features = {}
         
+        # Compute the STFT once: magnitude for spectral shape, log-mel for MFCC/onsets
+        S = self._compute_stft(audio_frame)
+        mel_db = self._compute_log_mel(S)
+        
         # Extract MFCC features
-        features['mfcc'] = self._extract_mfcc(audio_frame)
+        features['mfcc'] = self._extract_mfcc(audio_frame, mel_db=mel_db)
         features['mfcc_delta'] = self._extract_mfcc_delta(features['mfcc'])
         features['mfcc_delta2'] = self._extract_mfcc_delta(features['mfcc_delta'])
         
         # Extract pitch (F0) features
         features['pitch_mean'], features['pitch_std'] = self._extract_pitch(audio_frame)
         
-        # Extract energy features
-        features['energy_mean'], features['energy_std'] = self._extract_energy(audio_frame)
+        # Frame-wise RMS and ZCR in one fused pass, summarized into
+        # energy mean/std, shimmer (voice quality) and mean ZCR by a second kernel
+        rms, zcr = frame_stats(audio_frame, self.n_fft, self.hop_length)
+        (
+            features['energy_mean'], features['energy_std'],
+            features['shimmer'], features['zcr_mean']
+        ) = frame_summary(rms, zcr)
         
-        # Extract jitter and shimmer (voice quality)
+        # Extract jitter (voice quality)
         features['jitter'] = self._extract_jitter(audio_frame)
-        features['shimmer'] = self._extract_shimmer(audio_frame)
         
         # Extract speech rate
-        features['speech_rate'] = self._extract_speech_rate(audio_frame)
-        
-        # Extract zero crossing rate
-        features['zcr_mean'] = self._extract_zero_crossing_rate(audio_frame)
+        features['speech_rate'] = self._extract_speech_rate(audio_frame, mel_db=mel_db)
         
         # Extract spectral features
-        features['spectral_centroid'] = self._extract_spectral_centroid(audio_frame)
-        features['spectral_rolloff'] = self._extract_spectral_rolloff(audio_frame)
+        features['spectral_centroid'] = self._extract_spectral_centroid(audio_frame, S=S)
+        features['spectral_rolloff'] = self._extract_spectral_rolloff(audio_frame, S=S)
         
         return features
     
-    def _extract_mfcc(self, audio):
-        """Extract MFCC coefficients"""
-        mfcc = librosa.feature.mfcc(
-            y=audio,
-            sr=self.sample_rate,
-            n_mfcc=self.n_mfcc,
+    def _compute_stft(self, audio):
+        """Compute the STFT magnitude spectrogram with the precomputed window"""
+        S = np.abs(librosa.stft(
+            audio,
             n_fft=self.n_fft,
-            hop_length=self.hop_length
-        )
+            hop_length=self.hop_length,
+            window=self._window
+        ))
+        return S
+    
+    def _compute_log_mel(self, S):
+        """Project a magnitude spectrogram onto the mel filterbank (power, dB)"""
+        return librosa.power_to_db(self._mel @ (S ** 2))
+    
+    def _extract_mfcc(self, audio, mel_db=None):
+        """Extract MFCC coefficients (from a precomputed log-mel spectrogram if given)"""
+        if mel_db is None:
+            mel_db = self._compute_log_mel(self._compute_stft(audio))
+        
+        mfcc = librosa.feature.mfcc(S=mel_db, n_mfcc=self.n_mfcc)
         return mfcc
     
     def _extract_mfcc_delta(self, mfcc):
@@ -75,46 +107,54 @@ class AudioFeatureExtractor:
     
     def _extract_pitch(self, audio):
         """
-        Extract pitch (fundamental frequency) using PYIN
+        Extract pitch (fundamental frequency) using YIN, or PYIN if fast_pitch is off
         
         Returns:
             Mean and standard deviation of pitch
         """
         try:
-            f0, voiced_flag, voiced_probs = librosa.pyin(
-                audio,
-                fmin=self.fmin,
-                fmax=self.fmax,
-                sr=self.sample_rate
-            )
-            
-            # Filter out unvoiced frames
-            f0_voiced = f0[voiced_flag]
+            if self.fast_pitch:
+                f0 = librosa.yin(
+                    audio,
+                    fmin=self.fmin,
+                    fmax=self.fmax,
+                    sr=self.sample_rate,
+                    frame_length=self.n_fft,
+                    hop_length=self.hop_length
+                )
+                
+                # YIN estimates every frame, noise included; keep frames that are periodic at
+                # their estimated lag and inside the search range (the comparisons drop NaN)
+                periodicity = frame_periodicity(
+                    audio, f0, self.sample_rate, self.n_fft, self.hop_length
+                )
+                voiced = (periodicity >= self.voicing_threshold) & (f0 > self.fmin) & (f0 < self.fmax)
+                f0_voiced = f0[voiced]
+            else:
+                f0, voiced_flag, voiced_probs = librosa.pyin(
+                    audio,
+                    fmin=self.fmin,
+                    fmax=self.fmax,
+                    sr=self.sample_rate
+                )
+                
+                # Filter out unvoiced frames and NaN estimates
+                f0_voiced = f0[voiced_flag]
+                f0_voiced = f0_voiced[~np.isnan(f0_voiced)]
             
-            if len(f0_voiced) > 0:
-                pitch_mean = np.nanmean(f0_voiced)
-                pitch_std = np.nanstd(f0_voiced)
+            # NaN-free array, so plain mean/std avoid the nan* mask-and-copy passes
+            if f0_voiced.size > 0:
+                pitch_mean = float(f0_voiced.mean())
+                pitch_std = float(f0_voiced.std())
             else:
                 pitch_mean = 0.0
                 pitch_std = 0.0
                 
             return pitch_mean, pitch_std
         except Exception as e:
-            print(f"Pitch extraction error: {e}")
+            log.warning("Pitch extraction error: %s", e)
             return 0.0, 0.0
     
-    def _extract_energy(self, audio):
-        """
-        Extract RMS energy
-        
-        Returns:
-            Mean and standard deviation of energy
-        """
-        rms = librosa.feature.rms(y=audio, hop_length=self.hop_length)[0]
-        energy_mean = np.mean(rms)
-        energy_std = np.std(rms)
-        return energy_mean, energy_std
-    
     def _extract_jitter(self, audio):
         """
         Calculate jitter (pitch period variability)
@@ -147,33 +187,10 @@ class AudioFeatureExtractor:
                 
             return float(jitter)
         except Exception as e:
-            print(f"Jitter extraction error: {e}")
+            log.warning("Jitter extraction error: %s", e)
             return 0.0
     
-    def _extract_shimmer(self, audio):
-        """
-        Calculate shimmer (amplitude variability)
-        
-        Returns:
-            Shimmer value
-        """
-        try:
-            # Calculate frame-wise amplitude
-            rms = librosa.feature.rms(y=audio, hop_length=self.hop_length)[0]
-            
-            if len(rms) > 1:
-                # Calculate amplitude differences
-                amp_diffs = np.abs(np.diff(rms))
-                shimmer = np.mean(amp_diffs) / (np.mean(rms) + 1e-6)
-            else:
-                shimmer = 0.0
-                
-            return float(shimmer)
-        except Exception as e:
-            print(f"Shimmer extraction error: {e}")
-            return 0.0
-    
-    def _extract_speech_rate(self, audio):
+    def _extract_speech_rate(self, audio, mel_db=None):
         """
         Estimate speech rate (syllables per second)
         Using onset detection as proxy
@@ -183,7 +200,15 @@ class AudioFeatureExtractor:
         """
         try:
             # Detect onsets (syllable approximation)
-            onset_env = librosa.onset.onset_strength(y=audio, sr=self.sample_rate)
+            if mel_db is not None:
+                # Same n_fft/hop as librosa's default onset spectrogram
+                onset_env = librosa.onset.onset_strength(
+                    S=mel_db,
+                    sr=self.sample_rate,
+                    hop_length=self.hop_length
+                )
+            else:
+                onset_env = librosa.onset.onset_strength(y=audio, sr=self.sample_rate)
             onsets = librosa.onset.onset_detect(
                 onset_envelope=onset_env,
                 sr=self.sample_rate,
@@ -196,28 +221,31 @@ class AudioFeatureExtractor:
             
             return float(speech_rate)
         except Exception as e:
-            print(f"Speech rate extraction error: {e}")
+            log.warning("Speech rate extraction error: %s", e)
             return 0.0
     
-    def _extract_zero_crossing_rate(self, audio):
-        """Extract zero crossing rate (voice/unvoiced indicator)"""
-        zcr = librosa.feature.zero_crossing_rate(audio, hop_length=self.hop_length)[0]
-        return float(np.mean(zcr))
-    
-    def _extract_spectral_centroid(self, audio):
-        """Extract spectral centroid (brightness)"""
+    def _extract_spectral_centroid(self, audio, S=None):
+        """Extract spectral centroid (brightness), from a precomputed magnitude spectrogram if given"""
+        if S is None:
+            S = self._compute_stft(audio)
+        
         centroid = librosa.feature.spectral_centroid(
-            y=audio,
+            S=S,
             sr=self.sample_rate,
+            n_fft=self.n_fft,
             hop_length=self.hop_length
         )[0]
         return float(np.mean(centroid))
     
-    def _extract_spectral_rolloff(self, audio):
-        """Extract spectral rolloff"""
+    def _extract_spectral_rolloff(self, audio, S=None):
+        """Extract spectral rolloff, from a precomputed magnitude spectrogram if given"""
+        if S is None:
+            S = self._compute_stft(audio)
+        
         rolloff = librosa.feature.spectral_rolloff(
-            y=audio,
+            S=S,
             sr=self.sample_rate,
+            n_fft=self.n_fft,
             hop_length=self.hop_length
         )[0]
         return float(np.mean(rolloff))
@@ -0,0 +1,154 @@
+"""
+Audio Feature Kernels
+Numba-compiled frame-level kernels for the audio feature extractor
+"""
+import math
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True, fastmath=True)
+def frame_stats(audio, frame_length, hop_length):
+    """
+    Compute frame-wise RMS energy and zero crossing rate in one pass
+    Framing matches librosa.feature.rms / zero_crossing_rate with center=True:
+    RMS frames are zero-padded, ZCR frames are edge-padded
+
+    Args:
+        audio: 1-D audio signal
+        frame_length: Samples per analysis frame
+        hop_length: Samples between frame starts
+
+    Returns:
+        Tuple of (rms, zcr) arrays, one value per frame
+    """
+    n = audio.shape[0]
+    half = frame_length // 2
+    n_frames = 1 + (n + 2 * half - frame_length) // hop_length
+
+    rms = np.empty(n_frames)
+    zcr = np.empty(n_frames)
+
+    for f in range(n_frames):
+        start = f * hop_length - half
+        power = 0.0
+        crossings = 0
+        prev_negative = False
+
+        for k in range(frame_length):
+            i = start + k
+
+            # Zero padding outside the signal for RMS
+            if 0 <= i < n:
+                v = audio[i]
+                power += v * v
+
+            # Edge padding outside the signal for ZCR
+            x = audio[min(max(i, 0), n - 1)]
+            negative = x < -1e-10
+            if k > 0 and negative != prev_negative:
+                crossings += 1
+            prev_negative = negative
+
+        rms[f] = math.sqrt(power / frame_length)
+        zcr[f] = crossings / frame_length
+
+    return rms, zcr
+
+
+@njit(cache=True, fastmath=True)
+def frame_summary(rms, zcr):
+    """
+    Summarize frame-wise RMS and ZCR into the chunk-level energy/voice-quality features
+
+    Args:
+        rms: Frame-wise RMS energy (at least one frame)
+        zcr: Frame-wise zero crossing rate
+
+    Returns:
+        Tuple of (energy_mean, energy_std, shimmer, zcr_mean)
+    """
+    n = rms.shape[0]
+
+    total = 0.0
+    for f in range(n):
+        total += rms[f]
+    energy_mean = total / n
+
+    # Second pass: squared deviations and frame-to-frame amplitude changes
+    ssd = 0.0
+    abs_diff = 0.0
+    for f in range(n):
+        d = rms[f] - energy_mean
+        ssd += d * d
+        if f > 0:
+            abs_diff += abs(rms[f] - rms[f - 1])
+    energy_std = math.sqrt(ssd / n)
+
+    # Shimmer: mean absolute amplitude change relative to mean amplitude
+    shimmer = 0.0
+    if n > 1:
+        shimmer = (abs_diff / (n - 1)) / (energy_mean + 1e-6)
+
+    zcr_total = 0.0
+    for f in range(zcr.shape[0]):
+        zcr_total += zcr[f]
+    zcr_mean = zcr_total / zcr.shape[0]
+
+    return energy_mean, energy_std, shimmer, zcr_mean
+
+
+# No fastmath: it assumes NaN never occurs, which would let NaN F0 estimates past the check
+@njit(cache=True)
+def frame_periodicity(audio, f0, sample_rate, frame_length, hop_length):
+    """
+    Normalized autocorrelation of each frame at the lag of its F0 estimate
+    Near 1 for voiced (periodic) frames, near 0 for noise; YIN returns an F0 for every
+    frame, so this is the voicing decision it lacks. Framing matches librosa.yin with
+    center=True (zero padding)
+
+    Args:
+        audio: 1-D audio signal
+        f0: Frame-wise F0 estimates in Hz
+        sample_rate: Audio sample rate in Hz
+        frame_length: Samples per analysis frame
+        hop_length: Samples between frame starts
+
+    Returns:
+        Array of periodicity values in [-1, 1], one per frame (0 where F0 is invalid)
+    """
+    n = audio.shape[0]
+    half = frame_length // 2
+    periodicity = np.zeros(f0.shape[0])
+
+    for f in range(f0.shape[0]):
+        # The comparison also rejects NaN
+        if not f0[f] > 0:
+            continue
+        lag = int(round(sample_rate / f0[f]))
+        if lag <= 0 or lag >= frame_length:
+            continue
+
+        start = f * hop_length - half
+        xy = 0.0
+        xx = 0.0
+        yy = 0.0
+        for k in range(frame_length - lag):
+            i = start + k
+            j = i + lag
+            x = audio[i] if 0 <= i < n else 0.0
+            y = audio[j] if 0 <= j < n else 0.0
+            xy += x * y
+            xx += x * x
+            yy += y * y
+
+        if xx > 0.0 and yy > 0.0:
+            periodicity[f] = xy / math.sqrt(xx * yy)
+
+    return periodicity
+
+
+# Compile at import so the JIT cost isn't paid on the first audio chunk; the preprocessor
+# hands over float32 audio, so warm up with float32 to compile the signature actually used
+frame_summary(*frame_stats(np.zeros(1024, dtype=np.float32), 512, 128))
+frame_periodicity(np.zeros(1024, dtype=np.float32), np.full(9, 100.0), 16000, 512, 128)
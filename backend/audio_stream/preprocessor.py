@@ -2,11 +2,15 @@
 Audio Preprocessor
 Handles noise reduction, normalization, and audio chunk processing
 """
+import logging
+import time
 import numpy as np
 import noisereduce as nr
 from scipy import signal
 import config
 
+log = logging.getLogger(__name__)
+
 
 class AudioPreprocessor:
     """Preprocesses raw audio data for feature extraction"""
@@ -15,24 +19,38 @@ class AudioPreprocessor:
         self.sample_rate = sample_rate
         self.chunk_size = int(sample_rate * config.AUDIO_CHUNK_DURATION)
         
-    def process_audio_chunk(self, audio_data):
+        # Stationary noise profiles per session (session_id -> (noise samples, mean energy,
+        # capture time)), estimated from the quietest frames of the session's chunks
+        self._noise_profiles = {}
+        self.noise_frame_length = 2048  # 128 ms at 16 kHz
+        self.noise_profile_fraction = config.NOISE_PROFILE_FRACTION
+        self.noise_profile_ttl = config.NOISE_PROFILE_TTL
+        
+    def process_audio_chunk(self, audio_data, session_id=None):
         """
         Process a chunk of audio data
         
         Args:
             audio_data: numpy array of audio samples (int16 or float32)
+            session_id: Session whose cached noise profile should be used
             
         Returns:
-            Processed audio as numpy array (float32, normalized)
+            Tuple of (audio, is_valid). If the chunk is silence, the float32 input is
+            returned unprocessed with is_valid False; otherwise the processed audio
+            (float32, normalized) with is_valid True
         """
-        # Convert to float32 if needed
+        # Convert to float32 if needed (no copy if already float32)
         if audio_data.dtype == np.int16:
             audio_float = audio_data.astype(np.float32) / 32768.0
         else:
-            audio_float = audio_data.astype(np.float32)
+            audio_float = np.asarray(audio_data, dtype=np.float32)
+        
+        # Skip the expensive pipeline for silent chunks
+        if not self.validate_audio_chunk(audio_float):
+            return audio_float, False
         
         # Apply noise reduction
-        audio_denoised = self._reduce_noise(audio_float)
+        audio_denoised = self._reduce_noise(audio_float, session_id)
         
         # Normalize audio
         audio_normalized = self._normalize_audio(audio_denoised)
@@ -40,33 +58,106 @@ class AudioPreprocessor:
         # Apply pre-emphasis filter (boost high frequencies)
         audio_emphasized = self._pre_emphasis(audio_normalized)
         
-        return audio_emphasized
+        return audio_emphasized, True
     
-    def _reduce_noise(self, audio):
+    def _reduce_noise(self, audio, session_id=None):
         """
         Reduce background noise using spectral subtraction
         
         Args:
             audio: Input audio signal
+            session_id: Session whose noise profile to use and refresh (None estimates
+                from this chunk alone, nothing is cached)
             
         Returns:
             Denoised audio signal
         """
         try:
             # Use noisereduce library for noise reduction
-            # Estimate noise from first 0.5 seconds
-            noise_sample_len = min(int(0.5 * self.sample_rate), len(audio) // 2)
+            noise_profile = self._update_noise_profile(audio, session_id)
+            if noise_profile is None:
+                return audio
+            
             reduced_noise = nr.reduce_noise(
                 y=audio,
                 sr=self.sample_rate,
+                y_noise=noise_profile,
                 stationary=True,
                 prop_decrease=0.8
             )
             return reduced_noise
         except Exception as e:
-            print(f"Noise reduction error: {e}")
+            log.warning("Noise reduction error: %s", e)
             return audio  # Return original if noise reduction fails
     
+    def _estimate_noise(self, audio):
+        """
+        Estimate background noise from the lowest-energy frames of a chunk
+        
+        Speech rarely fills a whole chunk, so its quietest frames (pauses between words)
+        hold the background noise rather than the voice
+        
+        Args:
+            audio: Input audio signal
+            
+        Returns:
+            Tuple of (noise samples, mean squared amplitude), or (None, inf) if the chunk
+            is too short or digitally silent
+        """
+        n_frames = len(audio) // self.noise_frame_length
+        if n_frames == 0:
+            return None, np.inf
+        
+        frames = audio[:n_frames * self.noise_frame_length].reshape(n_frames, self.noise_frame_length)
+        energies = np.einsum('ij,ij->i', frames, frames) / self.noise_frame_length
+        
+        # Digital silence (a muted or starting mic) says nothing about the room noise
+        candidates = np.flatnonzero(energies > 1e-10)
+        if len(candidates) == 0:
+            return None, np.inf
+        
+        n_noise = max(1, int(round(n_frames * self.noise_profile_fraction)))
+        quietest = candidates[np.argsort(energies[candidates])[:n_noise]]
+        quietest.sort()
+        return frames[quietest].ravel(), float(energies[quietest].mean())
+    
+    def _update_noise_profile(self, audio, session_id):
+        """
+        Get the noise profile for a chunk, refreshing the session's cached one
+        
+        The chunk's estimate replaces the cached profile when it is quieter (a cleaner
+        look at the background) or the cached one is older than NOISE_PROFILE_TTL
+        (the room changed)
+        
+        Args:
+            audio: Input audio signal
+            session_id: Session whose profile to use (None: this chunk's estimate, uncached)
+            
+        Returns:
+            Noise samples for noisereduce, or None if there is no estimate yet
+        """
+        noise, energy = self._estimate_noise(audio)
+        if session_id is None:
+            return noise
+        
+        now = time.monotonic()
+        cached = self._noise_profiles.get(session_id)
+        if noise is not None and (
+            cached is None or energy < cached[1] or now - cached[2] > self.noise_profile_ttl
+        ):
+            cached = self._noise_profiles[session_id] = (noise, energy, now)
+        
+        return cached[0] if cached is not None else None
+    
+    def reset_noise_profile(self, session_id=None):
+        """
+        Discard the cached noise profile so it is re-estimated from the next chunk
+        
+        Args:
+            session_id: Session to reset
+        """
+        self._noise_profiles.pop(session_id, None)
+    
     def _normalize_audio(self, audio):
         """
         Normalize audio to consistent RMS energy level
@@ -77,16 +168,16 @@ class AudioPreprocessor:
         Returns:
             Normalized audio signal
         """
-        # Calculate RMS energy
-        rms = np.sqrt(np.mean(audio ** 2))
+        # Calculate RMS energy (dot product, no squared temporary)
+        rms = np.sqrt(np.dot(audio, audio) / len(audio))
         
         if rms > 1e-6:  # Avoid division by zero
             # Target RMS level
             target_rms = 0.1
             normalized = audio * (target_rms / rms)
             
-            # Clip to prevent overflow
-            normalized = np.clip(normalized, -1.0, 1.0)
+            # Clip to prevent overflow (in place, the scaled copy is ours)
+            np.clip(normalized, -1.0, 1.0, out=normalized)
             return normalized
         else:
             return audio
@@ -102,7 +193,11 @@ class AudioPreprocessor:
         Returns:
             Pre-emphasized audio signal
         """
-        emphasized = np.append(audio[0], audio[1:] - coef * audio[:-1])
+        # Single output allocation, filled in place: y[n] = x[n] - coef * x[n-1]
+        emphasized = np.empty_like(audio)
+        emphasized[0] = audio[0]
+        np.multiply(audio[:-1], coef, out=emphasized[1:])
+        np.subtract(audio[1:], emphasized[1:], out=emphasized[1:])
         return emphasized
     
     def validate_audio_chunk(self, audio_data):
@@ -115,10 +210,7 @@ class AudioPreprocessor:
         Returns:
             Boolean indicating if chunk is valid (not silence)
         """
-        # Calculate energy
-        energy = np.sum(audio_data ** 2) / len(audio_data)
-        
-        # Energy threshold for silence detection
-        silence_threshold = 1e-4
+        # Sum of squares in a single BLAS call, compared without dividing by the length
+        energy = np.dot(audio_data, audio_data)
         
-        return energy > silence_threshold
+        return energy > config.SILENCE_ENERGY_THRESHOLD * len(audio_data)
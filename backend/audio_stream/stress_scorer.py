@@ -4,6 +4,7 @@ Converts emotion predictions to stress scores
 """
 import numpy as np
 import config
+from utils.scoring import window_weights
 
 
 class AudioStressScorer:
@@ -12,26 +13,43 @@ class AudioStressScorer:
     def __init__(self):
         self.emotion_stress_weights = config.EMOTION_STRESS_WEIGHTS
         
-    def calculate_stress_score(self, emotion, emotion_probabilities, confidence):
+        # Stress weights in label order for a vectorized weighted sum
+        self._labels = tuple(config.EMOTION_LABELS)
+        self._w = np.array(
+            [self.emotion_stress_weights.get(e, 0.5) for e in self._labels],
+            dtype=np.float32
+        )
+        
+        # Level boundaries for branchless classification
+        self._thresh = np.array([config.STRESS_LOW_THRESHOLD, config.STRESS_HIGH_THRESHOLD])
+        self._levels = ('Low', 'Medium', 'High')
+        
+    def calculate_stress_score(self, emotion, emotion_probabilities, confidence, with_details=True):
         """
         Calculate stress score from emotion prediction
         
         Args:
             emotion: Predicted emotion label (str)
-            emotion_probabilities: Dictionary of {emotion: probability}
+            emotion_probabilities: Dictionary of {emotion: probability}, or array of
+                probabilities ordered as config.EMOTION_LABELS
             confidence: Model confidence score
+            with_details: Whether to build the details dictionary
             
         Returns:
-            Tuple of (stress_score, stress_level, details)
+            Tuple of (stress_score, stress_level, details), details is None if not requested
         """
         # Method 1: Simple mapping from predicted emotion
         primary_stress = self.emotion_stress_weights.get(emotion, 0.5)
         
         # Method 2: Weighted average of all emotion probabilities
-        weighted_stress = 0.0
-        for emo, prob in emotion_probabilities.items():
-            stress_weight = self.emotion_stress_weights.get(emo, 0.5)
-            weighted_stress += prob * stress_weight
+        if isinstance(emotion_probabilities, dict):
+            probs_array = np.array(
+                [emotion_probabilities.get(e, 0.0) for e in self._labels],
+                dtype=np.float32
+            )
+        else:
+            probs_array = np.asarray(emotion_probabilities, dtype=np.float32)
+        weighted_stress = float(probs_array @ self._w)
         
         # Combine both methods (favor weighted average)
         final_stress = 0.3 * primary_stress + 0.7 * weighted_stress
@@ -45,6 +63,12 @@ class AudioStressScorer:
         # Determine stress level
         stress_level = self._classify_stress_level(stress_score)
         
+        if not with_details:
+            return float(stress_score), stress_level, None
+        
+        if not isinstance(emotion_probabilities, dict):
+            emotion_probabilities = dict(zip(self._labels, probs_array.tolist()))
+        
         # Create details dictionary
         details = {
             'primary_emotion': emotion,
@@ -68,12 +92,8 @@ class AudioStressScorer:
         Returns:
             Stress level: 'Low', 'Medium', or 'High'
         """
-        if stress_score < config.STRESS_LOW_THRESHOLD:
-            return 'Low'
-        elif stress_score < config.STRESS_HIGH_THRESHOLD:
-            return 'Medium'
-        else:
-            return 'High'
+        # side='right' keeps scores equal to a threshold in the upper level
+        return self._levels[int(np.searchsorted(self._thresh, stress_score, side='right'))]
     
     def aggregate_stress_scores(self, stress_scores, window_size=5):
         """
@@ -93,9 +113,7 @@ class AudioStressScorer:
         recent_scores = stress_scores[-window_size:]
         
         # Calculate weighted average (more recent = higher weight)
-        weights = np.exp(np.linspace(0, 1, len(recent_scores)))
-        weights = weights / np.sum(weights)
-        
-        aggregated = np.average(recent_scores, weights=weights)
+        weights = window_weights(len(recent_scores))
+        aggregated = weights @ np.asarray(recent_scores, dtype=np.float64)
         
         return float(aggregated)
@@ -11,6 +11,9 @@ BASE_DIR = Path(__file__).parent
 HOST = os.getenv('HOST', '0.0.0.0')
 PORT = int(os.getenv('PORT', 5000))
 DEBUG = os.getenv('DEBUG', 'True') == 'True'
+SOCKET_TCP_NODELAY = True  # Disable Nagle's algorithm for low-latency streaming
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')  # Per-chunk messages log at DEBUG
+SOCKET_SERIALIZER = 'msgpack'  # Socket.IO packet format: 'msgpack' (binary) or 'default' (JSON)
 
 # CORS Settings
 CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:3000').split(',')
@@ -20,6 +23,9 @@ AUDIO_SAMPLE_RATE = 16000  # 16 kHz
 AUDIO_CHUNK_DURATION = 3.0  # seconds
 AUDIO_OVERLAP = 0.5  # 50% overlap
 AUDIO_CHANNELS = 1  # mono
+SILENCE_ENERGY_THRESHOLD = 1e-4  # mean squared amplitude at or below which a chunk is silence (mirrored in the frontend)
+NOISE_PROFILE_FRACTION = 0.2  # Share of each chunk's lowest-energy frames used to estimate background noise
+NOISE_PROFILE_TTL = 30.0  # Seconds after which a session's noise profile is replaced by the latest estimate
 
 # Audio Feature Extraction
 MFCC_N_COEFF = 13
@@ -27,18 +33,48 @@ MFCC_N_FFT = 2048
 MFCC_HOP_LENGTH = 512
 PITCH_FMIN = 75  # Hz (minimum pitch)
 PITCH_FMAX = 600  # Hz (maximum pitch)
+PITCH_VOICING_THRESHOLD = 0.5  # Minimum normalized autocorrelation at the F0 lag for a YIN frame to count as voiced
 
 # Video Processing Settings
 VIDEO_FPS = 15  # Target frames per second
-VIDEO_FRAME_WIDTH = 640
-VIDEO_FRAME_HEIGHT = 480
+VIDEO_FRAME_WIDTH = 480  # Maximum capture size sent to clients on connect; frames are scaled down to fit
+VIDEO_FRAME_HEIGHT = 360
+VIDEO_JPEG_QUALITY = 75  # JPEG quality (0-100) clients encode frames with
+VIDEO_MAX_FRAME_BYTES = 256 * 1024  # Reject uploaded frames larger than this (decoded JPEG bytes)
+VIDEO_DECODE_DOWNSCALE = 2  # Decode JPEG frames at 1/1, 1/2, 1/4 or 1/8 size (DCT scaling, no resize pass)
 FACE_DETECTION_CONFIDENCE = 0.5
+FACE_DETECT_EVERY_K = 2  # Run Face Mesh on every Kth analyzed frame per session and reuse its landmarks in between (the emotion model still runs on each frame's crop); 2 gives 2.5 Hz Face Mesh on the bundled 5 FPS client
+LANDMARK_REUSE_EPS = 0.003  # RMS landmark shift (normalized coords) below which the last emotion prediction is reused; 0 disables
+VIDEO_PROCESS_EVERY_K = 1  # Decode and analyze every Kth uploaded frame per session, re-emit the last result (stale) in between (the bundled client uploads 5 FPS; raise for 30 FPS clients)
 
 # Model Paths
 MODELS_DIR = BASE_DIR / 'models'
 AUDIO_MODEL_PATH = MODELS_DIR / 'audio_emotion_model.pth'
 VIDEO_MODEL_PATH = MODELS_DIR / 'video_emotion_model.pth'
 
+# Inference Optimization
+AUDIO_MODEL_QUANTIZE = True  # INT8 dynamic quantization of LSTM/Linear layers (CPU only, PyTorch or ONNX)
+AUDIO_MODEL_JIT = True  # Frozen TorchScript module for the audio model
+AUDIO_MODEL_HALF_PRECISION = True  # FP16 on CUDA, BF16 autocast on CPU; False keeps FP32
+AUDIO_MODEL_ONNX = True  # Serve the audio model through ONNX Runtime on CPU (falls back to PyTorch)
+AUDIO_ONNX_PATH = MODELS_DIR / 'audio_emotion_model.onnx'
+AUDIO_ONNX_INT8_PATH = MODELS_DIR / 'audio_emotion_model.int8.onnx'
+AUDIO_BATCH_WINDOW = 0.02  # seconds to coalesce audio chunks into one batch
+AUDIO_BATCH_MAX_SIZE = 16  # maximum audio chunks per batched forward pass
+TORCH_NUM_THREADS = 1  # intra/inter-op threads per inference call (runs on eventlet's thread pool)
+VIDEO_MODEL_HEAD = 'fc'  # 'fc' (512*3*3 -> 512 -> 256) or 'gap' (global avg pool -> 256); 'gap' needs retrained weights
+VIDEO_MODEL_FUSE_BN = True  # Fold BatchNorm into Conv and drop Dropout layers after loading weights
+VIDEO_MODEL_HALF_PRECISION = True  # PyTorch path: FP16 on CUDA, BF16 autocast on CPU; False keeps FP32
+VIDEO_MODEL_JIT = True  # Frozen TorchScript module for the PyTorch video path
+VIDEO_MODEL_ONNX = True  # Serve the video CNN through ONNX Runtime on CPU (falls back to PyTorch)
+VIDEO_ONNX_PATH = MODELS_DIR / 'video_emotion_model.onnx'
+VIDEO_ONNX_INT8_PATH = MODELS_DIR / 'video_emotion_model.int8.onnx'
+VIDEO_CALIBRATION_DIR = BASE_DIR / 'data' / 'face_calibration'  # face images for static INT8 calibration
+VIDEO_BATCH_WINDOW = 0.01  # seconds to coalesce face crops into one batch (frames are latency-sensitive)
+VIDEO_BATCH_MAX_SIZE = 16  # maximum face crops per batched forward pass
+PIPELINE_WARMUP = True  # Run a synthetic audio chunk and face crop through both pipelines at startup
+PREDICTION_CACHE_SIZE = 64  # LRU entries per session and modality for repeated model inputs (keys are full input bytes); 0 disables the cache
+
 # Emotion Labels (7 basic emotions)
 EMOTION_LABELS = [
     'neutral',
@@ -64,6 +100,7 @@ EMOTION_STRESS_WEIGHTS = {
 # Fusion Settings
 AUDIO_WEIGHT = 0.5  # Weight for audio modality
 VIDEO_WEIGHT = 0.5  # Weight for video modality
+FUSION_STALE_WEIGHT = 0.5  # Confidence multiplier for a re-emitted (stale) video result
 
 # Stress Level Thresholds
 STRESS_LOW_THRESHOLD = 0.33
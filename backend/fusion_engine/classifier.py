@@ -2,6 +2,8 @@
 Stress Classifier
 Final stress level classification and interpretation
 """
+import math
+from itertools import islice
 import config
 
 
@@ -12,6 +14,33 @@ class StressClassifier:
         self.low_threshold = config.STRESS_LOW_THRESHOLD
         self.high_threshold = config.STRESS_HIGH_THRESHOLD
         
+        # Precomputed classification entries, one per stress level
+        self._low = self._make_classification(
+            'Low', 'green',
+            'Worker appears calm and relaxed',
+            'Maintain current work conditions'
+        )
+        self._medium = self._make_classification(
+            'Medium', 'yellow',
+            'Worker shows moderate stress indicators',
+            'Monitor closely for any changes'
+        )
+        self._high = self._make_classification(
+            'High', 'red',
+            'Worker shows elevated stress levels',
+            'Suggest taking a break and assess workload'
+        )
+        
+    def _make_classification(self, level, color, description, recommendation):
+        """Build a classification template; 'score' is filled in per call"""
+        return {
+            'level': level,
+            'score': 0.0,
+            'color': color,
+            'description': description,
+            'recommendation': recommendation
+        }
+        
     def classify(self, stress_score):
         """
         Classify stress score into categorical level
@@ -23,28 +52,14 @@ class StressClassifier:
             Dictionary with classification and interpretation
         """
         if stress_score < self.low_threshold:
-            level = 'Low'
-            color = 'green'
-            description = 'Worker appears calm and relaxed'
-            recommendation = 'Maintain current work conditions'
+            entry = self._low
         elif stress_score < self.high_threshold:
-            level = 'Medium'
-            color = 'yellow'
-            description = 'Worker shows moderate stress indicators'
-            recommendation = 'Monitor closely for any changes'
+            entry = self._medium
         else:
-            level = 'High'
-            color = 'red'
-            description = 'Worker shows elevated stress levels'
-            recommendation = 'Suggest taking a break and assess workload'
+            entry = self._high
         
-        return {
-            'level': level,
-            'score': float(stress_score),
-            'color': color,
-            'description': description,
-            'recommendation': recommendation
-        }
+        # Copy so callers can't mutate the shared template
+        return {**entry, 'score': float(stress_score)}
     
     def get_stress_trend(self, stress_history, window=10):
         """
@@ -64,15 +79,14 @@ class StressClassifier:
                 'change': 0.0
             }
         
-        # Get recent window
-        recent = stress_history[-min(window, len(stress_history)):]
-        
-        # Calculate trend
-        first_half = recent[:len(recent)//2]
-        second_half = recent[len(recent)//2:]
+        # Get recent window bounds without copying it
+        n = len(stress_history)
+        start = n - min(window, n)
+        mid = start + (n - start) // 2
         
-        avg_first = sum(first_half) / len(first_half)
-        avg_second = sum(second_half) / len(second_half)
+        # Calculate trend from the two half-window averages
+        avg_first = math.fsum(islice(stress_history, start, mid)) / (mid - start)
+        avg_second = math.fsum(islice(stress_history, mid, n)) / (n - mid)
         
         change = avg_second - avg_first
         
@@ -12,6 +12,9 @@ class MultimodalFusion:
     def __init__(self):
         self.audio_weight = config.AUDIO_WEIGHT
         self.video_weight = config.VIDEO_WEIGHT
+        self.stale_weight = config.FUSION_STALE_WEIGHT
+        self.low_threshold = config.STRESS_LOW_THRESHOLD
+        self.high_threshold = config.STRESS_HIGH_THRESHOLD
         
     def fuse_stress_scores(self, audio_result=None, video_result=None):
         """
@@ -55,19 +58,27 @@ class MultimodalFusion:
         Returns:
             Fused stress analysis
         """
-        # Extract stress scores and confidences
-        audio_stress = audio_result.get('stress_score', 0.5)
-        audio_conf = audio_result.get('confidence', 0.5)
+        # Read every field once up front, coercing numpy scalars here
+        # so everything derived below is already a plain Python float
+        audio_stress = float(audio_result.get('stress_score', 0.5))
+        audio_conf = float(audio_result.get('confidence', 0.5))
+        audio_emotion = audio_result.get('emotion', 'neutral')
+        audio_level = audio_result.get('stress_level', 'Medium')
+        
+        video_stress = float(video_result.get('stress_score', 0.5))
+        video_conf = float(video_result.get('confidence', 0.5))
+        video_emotion = video_result.get('emotion', 'neutral')
+        video_level = video_result.get('stress_level', 'Medium')
         
-        video_stress = video_result.get('stress_score', 0.5)
-        video_conf = video_result.get('confidence', 0.5)
+        # A re-emitted video result describes an earlier frame, so it weighs less
+        video_weight_conf = video_conf * self.stale_weight if video_result.get('stale') else video_conf
         
         # Dynamic weight adjustment based on confidence
         # More confident modality gets higher weight
-        total_conf = audio_conf + video_conf
+        total_conf = audio_conf + video_weight_conf
         if total_conf > 0:
             dynamic_audio_weight = audio_conf / total_conf
-            dynamic_video_weight = video_conf / total_conf
+            dynamic_video_weight = video_weight_conf / total_conf
         else:
             dynamic_audio_weight = 0.5
             dynamic_video_weight = 0.5
@@ -85,44 +96,39 @@ class MultimodalFusion:
         fused_level = self._classify_stress_level(fused_stress)
         
         # Determine dominant modality
-        if abs(audio_stress - video_stress) < 0.1:
+        disagreement = abs(audio_stress - video_stress)
+        if disagreement < 0.1:
             agreement = 'high'
-        elif abs(audio_stress - video_stress) < 0.3:
+        elif disagreement < 0.3:
             agreement = 'medium'
         else:
             agreement = 'low'
         
-        # Combine emotions
-        audio_emotion = audio_result.get('emotion', 'neutral')
-        video_emotion = video_result.get('emotion', 'neutral')
-        
         # Create fused result
-        fused_result = {
-            'stress_score': float(fused_stress),
+        return {
+            'stress_score': fused_stress,
             'stress_level': fused_level,
-            'confidence': float(fused_confidence),
+            'confidence': fused_confidence,
             'modalities_used': ['audio', 'video'],
             'audio': {
-                'stress_score': float(audio_stress),
+                'stress_score': audio_stress,
                 'emotion': audio_emotion,
-                'confidence': float(audio_conf),
-                'stress_level': audio_result.get('stress_level', 'Medium')
+                'confidence': audio_conf,
+                'stress_level': audio_level
             },
             'video': {
-                'stress_score': float(video_stress),
+                'stress_score': video_stress,
                 'emotion': video_emotion,
-                'confidence': float(video_conf),
-                'stress_level': video_result.get('stress_level', 'Medium')
+                'confidence': video_conf,
+                'stress_level': video_level
             },
             'fusion_method': 'confidence_weighted_average',
             'modality_agreement': agreement,
             'weights': {
-                'audio': float(dynamic_audio_weight),
-                'video': float(dynamic_video_weight)
+                'audio': dynamic_audio_weight,
+                'video': dynamic_video_weight
             }
         }
-        
-        return fused_result
     
     def _single_modality_result(self, result, modality):
         """
@@ -177,9 +183,9 @@ class MultimodalFusion:
         Returns:
             Stress level: 'Low', 'Medium', or 'High'
         """
-        if stress_score < config.STRESS_LOW_THRESHOLD:
+        if stress_score < self.low_threshold:
             return 'Low'
-        elif stress_score < config.STRESS_HIGH_THRESHOLD:
+        elif stress_score < self.high_threshold:
             return 'Medium'
         else:
             return 'High'
@@ -0,0 +1,8 @@
+"""
+Test configuration
+Puts the backend directory on sys.path so tests import modules the way app.py does
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
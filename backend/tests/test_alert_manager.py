@@ -0,0 +1,41 @@
+"""
+Tests for stress alerts
+"""
+from utils import AlertManager
+
+
+def spike_alerts(alerts):
+    return [alert for alert in alerts if alert['type'] == 'sudden_stress_spike']
+
+
+def test_spike_alert_fires_once_per_window():
+    manager = AlertManager()
+    for t in range(3):
+        assert manager.check_alerts('s1', 0.2, timestamp=t) == []
+
+    first = spike_alerts(manager.check_alerts('s1', 0.8, timestamp=3))
+    assert len(first) == 1
+    assert first[0]['timestamp'] == 3
+
+    # A second spike inside the window is deduplicated
+    manager.check_alerts('s1', 0.2, timestamp=4)
+    assert spike_alerts(manager.check_alerts('s1', 0.9, timestamp=5)) == []
+
+    # Once the window has passed, a new spike alerts again
+    for t in range(6, 11):
+        manager.check_alerts('s1', 0.2, timestamp=t)
+    assert len(spike_alerts(manager.check_alerts('s1', 0.9, timestamp=3 + manager.spike_window))) == 1
+
+
+def test_spike_dedupe_is_per_session():
+    manager = AlertManager()
+    for session_id in ('s1', 's2'):
+        manager.check_alerts(session_id, 0.2, timestamp=0)
+    assert len(spike_alerts(manager.check_alerts('s1', 0.8, timestamp=1))) == 1
+    assert len(spike_alerts(manager.check_alerts('s2', 0.8, timestamp=1))) == 1
+
+
+def test_small_increase_does_not_alert():
+    manager = AlertManager()
+    manager.check_alerts('s1', 0.4, timestamp=0)
+    assert spike_alerts(manager.check_alerts('s1', 0.6, timestamp=1)) == []
@@ -0,0 +1,28 @@
+"""
+Tests for the real-time audio feature extractor
+"""
+import numpy as np
+
+from audio_stream.feature_extractor import AudioFeatureExtractor
+from audio_stream.feature_kernels import frame_periodicity
+
+
+def test_yin_pitch_is_zero_on_noise():
+    noise = (0.1 * np.random.default_rng(0).standard_normal(48000)).astype(np.float32)
+    assert AudioFeatureExtractor()._extract_pitch(noise) == (0.0, 0.0)
+
+
+def test_yin_pitch_tracks_voiced_signal():
+    t = np.arange(48000) / 16000
+    voiced = sum(np.sin(2 * np.pi * 150 * k * t) / k for k in range(1, 8))
+    pitch_mean, pitch_std = AudioFeatureExtractor()._extract_pitch((0.1 * voiced).astype(np.float32))
+    assert abs(pitch_mean - 150) < 2
+    assert pitch_std < 2
+
+
+def test_periodicity_skips_invalid_f0():
+    audio = (0.1 * np.random.default_rng(0).standard_normal(8192)).astype(np.float32)
+    f0 = np.array([np.nan, np.inf, 0.0, -5.0, 5.0, 150.0] + [150.0] * 11)
+    periodicity = frame_periodicity(audio, f0, 16000, 2048, 512)
+    assert periodicity[:5].tolist() == [0.0] * 5
+    assert periodicity[5] != 0.0
@@ -0,0 +1,64 @@
+"""
+Tests for micro-batching concurrent predictions
+"""
+import eventlet
+import pytest
+
+from utils import InferenceBatcher
+
+
+class RecordingModel:
+    """predict_batch stand-in that doubles each input and records the batches it saw"""
+
+    def __init__(self):
+        self.batches = []
+
+    def predict_batch(self, items):
+        self.batches.append(list(items))
+        return [item * 2 for item in items]
+
+
+def test_single_request():
+    model = RecordingModel()
+    batcher = InferenceBatcher(model.predict_batch, window=0.01)
+    assert batcher.submit(21) == 42
+    assert model.batches == [[21]]
+
+
+def test_concurrent_requests_share_one_batch_in_order():
+    model = RecordingModel()
+    batcher = InferenceBatcher(model.predict_batch, window=0.05, max_batch_size=16)
+
+    pool = eventlet.GreenPool()
+    results = list(pool.imap(batcher.submit, range(8)))
+
+    # Each caller gets the prediction for its own input
+    assert results == [i * 2 for i in range(8)]
+    assert model.batches == [list(range(8))]
+
+
+def test_batches_are_capped_at_max_batch_size():
+    model = RecordingModel()
+    batcher = InferenceBatcher(model.predict_batch, window=0.05, max_batch_size=3)
+
+    pool = eventlet.GreenPool()
+    results = list(pool.imap(batcher.submit, range(7)))
+
+    assert results == [i * 2 for i in range(7)]
+    assert [len(batch) for batch in model.batches] == [3, 3, 1]
+    assert [item for batch in model.batches for item in batch] == list(range(7))
+
+
+def test_batch_failure_reaches_every_caller():
+    def failing_predict(items):
+        raise RuntimeError('model failed')
+
+    batcher = InferenceBatcher(failing_predict, window=0.05)
+
+    def submit(item):
+        with pytest.raises(RuntimeError, match='model failed'):
+            batcher.submit(item)
+        return True
+
+    pool = eventlet.GreenPool()
+    assert all(pool.imap(submit, range(3)))
@@ -0,0 +1,87 @@
+"""
+Tests for the numba kernels against librosa/NumPy references
+"""
+import librosa
+import numpy as np
+import pytest
+
+from audio_stream.feature_kernels import frame_periodicity, frame_stats, frame_summary
+from video_stream.score_kernels import FEATURE_KEYS, score_core
+
+
+@pytest.fixture
+def audio():
+    rng = np.random.default_rng(0)
+    t = np.arange(24000) / 16000
+    tone = 0.3 * np.sin(2 * np.pi * 220 * t) * (t > 0.5)
+    return (tone + 0.02 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+def test_frame_stats_matches_librosa(audio):
+    rms, zcr = frame_stats(audio, 2048, 512)
+    expected_rms = librosa.feature.rms(y=audio, frame_length=2048, hop_length=512)[0]
+    expected_zcr = librosa.feature.zero_crossing_rate(audio, frame_length=2048, hop_length=512)[0]
+    np.testing.assert_allclose(rms, expected_rms, rtol=1e-4, atol=1e-7)
+    np.testing.assert_allclose(zcr, expected_zcr, atol=1e-9)
+
+
+def test_frame_summary_matches_numpy(audio):
+    rms, zcr = frame_stats(audio, 2048, 512)
+    energy_mean, energy_std, shimmer, zcr_mean = frame_summary(rms, zcr)
+    assert energy_mean == pytest.approx(rms.mean())
+    assert energy_std == pytest.approx(rms.std())
+    assert shimmer == pytest.approx(np.abs(np.diff(rms)).mean() / (rms.mean() + 1e-6))
+    assert zcr_mean == pytest.approx(zcr.mean())
+
+
+def test_frame_periodicity_matches_numpy(audio):
+    frame_length, hop_length = 2048, 512
+    f0 = np.full(1 + len(audio) // hop_length, 220.0)
+    f0[3] = np.nan
+    periodicity = frame_periodicity(audio, f0, 16000, frame_length, hop_length)
+
+    padded = np.pad(audio.astype(np.float64), frame_length // 2)
+    lag = int(round(16000 / 220.0))
+    for f in (0, 10, 30, len(f0) - 1):
+        frame = padded[f * hop_length:f * hop_length + frame_length]
+        x, y = frame[:-lag], frame[lag:]
+        expected = x @ y / np.sqrt((x @ x) * (y @ y))
+        assert periodicity[f] == pytest.approx(expected, abs=1e-6)
+    assert periodicity[3] == 0.0
+
+
+def reference_score(feat, has_features, probs, weights, primary_stress, confidence, low_thr, high_thr):
+    """Straight transcription of the scorer's formula"""
+    weighted_stress = float(np.dot(probs.astype(np.float64), weights.astype(np.float64)))
+    feature_stress = 0.5
+    if has_features:
+        eye_openness, eyebrow, _, _, pitch, yaw, _, symmetry, strain, tension = feat
+        openness_stress = 0.7 if eye_openness < 0.15 else 0.4 if eye_openness < 0.2 else 0.1
+        pose_stress = 0.6 if abs(pitch) > 20 or abs(yaw) > 20 else 0.2
+        feature_stress = np.clip(
+            (strain + tension + openness_stress + min(eyebrow * 10, 1.0) + (1 - symmetry) + pose_stress) / 6,
+            0, 1
+        )
+    combined = 0.3 * primary_stress + 0.4 * weighted_stress + 0.3 * feature_stress
+    score = float(np.clip(combined * confidence + 0.5 * (1 - confidence), 0, 1))
+    level = 0 if score < low_thr else 1 if score < high_thr else 2
+    return score, level, weighted_stress, feature_stress
+
+
+def test_score_core_matches_reference():
+    rng = np.random.default_rng(0)
+    weights = rng.random(7).astype(np.float32)
+    for _ in range(200):
+        feat = rng.random(len(FEATURE_KEYS))
+        feat[0] *= 0.3
+        feat[4:6] = rng.uniform(-40, 40, 2)
+        probs = rng.dirichlet(np.ones(7)).astype(np.float32)
+        has_features = bool(rng.random() < 0.8)
+        args = (feat, has_features, probs, weights, float(rng.random()), float(rng.random()), 0.3, 0.7)
+
+        score, level, weighted, feature = score_core(*args)
+        expected = reference_score(*args)
+        assert score == pytest.approx(expected[0], abs=1e-6)
+        assert level == expected[1]
+        assert weighted == pytest.approx(expected[2], abs=1e-6)
+        assert feature == pytest.approx(expected[3], abs=1e-9)
@@ -0,0 +1,101 @@
+"""
+Tests for the per-session emotion prediction cache
+"""
+import numpy as np
+
+import websocket_handler
+from utils import PredictionCache, audio_cache_key, face_cache_key
+
+
+class CountingBatcher:
+    """Stands in for InferenceBatcher, returning a distinct prediction per call"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def submit(self, model_input):
+        self.calls += 1
+        return ('neutral', {'neutral': 1.0}, float(self.calls))
+
+
+def make_handler():
+    handler = websocket_handler.WebSocketHandler.__new__(websocket_handler.WebSocketHandler)
+    handler._prediction_caches = {}
+    handler._retired_cache_stats = {
+        'audio': {'hits': 0, 'misses': 0},
+        'video': {'hits': 0, 'misses': 0}
+    }
+    return handler
+
+
+def test_hit_and_miss_counters():
+    cache = PredictionCache(4)
+    assert cache.get('a') is None
+    cache.put('a', 1)
+    assert cache.get('a') == 1
+    assert cache.get_stats()['hits'] == 1
+    assert cache.get_stats()['misses'] == 1
+    assert cache.get_stats()['hit_rate'] == 0.5
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = PredictionCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    # Touch 'a' so 'b' is the least recently used entry
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert len(cache) == 2
+
+
+def test_audio_keys_hold_full_bytes():
+    features = np.round(np.random.default_rng(0).standard_normal((10, 12)), 2).astype(np.float32)
+    nudged = features.copy()
+    nudged[3, 4] += 0.1
+    assert audio_cache_key(features) == audio_cache_key(features + 1e-3)
+    assert audio_cache_key(features) != audio_cache_key(nudged)
+    # Same bytes in a different shape are a different input
+    assert audio_cache_key(features) != audio_cache_key(features.reshape(12, 10))
+
+
+def test_face_keys_differ_for_different_faces():
+    rng = np.random.default_rng(1)
+    face_a = rng.random((48, 48), dtype=np.float32)
+    face_b = rng.random((48, 48), dtype=np.float32)
+    assert face_cache_key(face_a) == face_cache_key(face_a.copy())
+    assert face_cache_key(face_a) != face_cache_key(face_b)
+
+
+def test_sessions_do_not_share_predictions():
+    handler = make_handler()
+    batcher = CountingBatcher()
+    face = np.full((48, 48), 0.5, dtype=np.float32)
+
+    first = handler._predict_cached(handler._prediction_cache('s1', 'video'), face_cache_key, batcher, face)
+    again = handler._predict_cached(handler._prediction_cache('s1', 'video'), face_cache_key, batcher, face)
+    other = handler._predict_cached(handler._prediction_cache('s2', 'video'), face_cache_key, batcher, face)
+
+    assert again is first
+    assert other is not first
+    assert batcher.calls == 2
+
+    stats = handler.get_cache_stats()
+    assert stats['sessions'] == 2
+    assert stats['video']['hits'] == 1
+    assert stats['video']['misses'] == 2
+    assert stats['audio']['hits'] == 0
+
+
+def test_unknown_session_is_not_cached():
+    handler = make_handler()
+    batcher = CountingBatcher()
+    face = np.zeros((48, 48), dtype=np.float32)
+
+    assert handler._prediction_cache(None, 'video') is None
+    handler._predict_cached(None, face_cache_key, batcher, face)
+    handler._predict_cached(None, face_cache_key, batcher, face)
+    assert batcher.calls == 2
+    assert handler._prediction_caches == {}
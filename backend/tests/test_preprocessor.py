@@ -0,0 +1,46 @@
+"""
+Tests for the audio preprocessor's noise profile
+"""
+import numpy as np
+
+from audio_stream.preprocessor import AudioPreprocessor
+
+
+def speech_chunk(noise_level=0.01, seed=0):
+    """3 s chunk: background noise throughout, a loud tone from 0.8 s on"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(48000) / 16000
+    tone = 0.3 * np.sin(2 * np.pi * 200 * t) * (t > 0.8)
+    return (tone + noise_level * rng.standard_normal(len(t))).astype(np.float32)
+
+
+def test_profile_comes_from_quiet_frames():
+    preprocessor = AudioPreprocessor()
+    noise, energy = preprocessor._estimate_noise(speech_chunk())
+    # Only the noise-only lead-in is picked, not the tone
+    assert np.isclose(energy, 0.01 ** 2, rtol=0.1)
+    assert np.abs(noise).max() < 0.1
+
+
+def test_profile_refreshes_when_quieter_or_expired():
+    preprocessor = AudioPreprocessor()
+    preprocessor.process_audio_chunk(speech_chunk(0.02), 's1')
+    loud = preprocessor._noise_profiles['s1'][1]
+
+    preprocessor.process_audio_chunk(speech_chunk(0.01), 's1')
+    quiet = preprocessor._noise_profiles['s1'][1]
+    assert quiet < loud
+
+    # A louder estimate only replaces the profile once it has expired
+    preprocessor.process_audio_chunk(speech_chunk(0.02), 's1')
+    assert preprocessor._noise_profiles['s1'][1] == quiet
+    preprocessor.noise_profile_ttl = 0
+    preprocessor.process_audio_chunk(speech_chunk(0.02), 's1')
+    assert preprocessor._noise_profiles['s1'][1] > quiet
+
+
+def test_unknown_session_is_not_cached():
+    preprocessor = AudioPreprocessor()
+    _, is_valid = preprocessor.process_audio_chunk(speech_chunk(), None)
+    assert is_valid
+    assert preprocessor._noise_profiles == {}
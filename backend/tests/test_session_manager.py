@@ -0,0 +1,62 @@
+"""
+Tests for session history and analytics
+"""
+import pytest
+
+from utils import SessionManager
+
+
+def make_session(scores):
+    manager = SessionManager()
+    session_id = manager.create_session()
+    for score in scores:
+        manager.update_session(session_id, {'stress_score': score, 'stress_level': 'Low'})
+    return manager, session_id
+
+
+def test_timeline_returns_last_points_in_order():
+    manager, session_id = make_session([0.1, 0.2, 0.3, 0.4])
+    timeline = manager.get_stress_timeline(session_id, limit=2)
+    assert [point['stress_score'] for point in timeline] == [0.3, 0.4]
+
+
+def test_timeline_limit_zero_or_negative_returns_whole_history():
+    manager, session_id = make_session([0.1, 0.2, 0.3])
+    for limit in (0, -1, -5, '0'):
+        timeline = manager.get_stress_timeline(session_id, limit=limit)
+        assert [point['stress_score'] for point in timeline] == [0.1, 0.2, 0.3]
+
+
+def test_timeline_limit_above_history_length():
+    manager, session_id = make_session([0.1, 0.2])
+    assert len(manager.get_stress_timeline(session_id, limit=100)) == 2
+
+
+def test_running_stats_match_statistics_over_a_sliding_window():
+    import random
+    import statistics
+
+    manager = SessionManager()
+    manager.max_history = 50
+    session_id = manager.create_session()
+    session = manager.get_session(session_id)
+
+    rng = random.Random(0)
+    scores = []
+    for i in range(2000):
+        # Drifting level so the window min/max keep changing hands
+        score = min(max(rng.gauss(0.5 + 0.3 * ((i // 300) % 2), 0.15), 0.0), 1.0)
+        scores.append(score)
+        manager.update_session(session_id, {'stress_score': score, 'stress_level': 'Low'})
+
+        window = scores[-50:]
+        assert session['running_count'] == len(window)
+        assert session['running_mean'] == pytest.approx(statistics.fmean(window), abs=1e-9)
+        assert session['running_ssd'] / len(window) == pytest.approx(statistics.pvariance(window), abs=1e-9)
+        assert session['running_max'][0] == max(window)
+        assert session['running_min'][0] == min(window)
+        assert session['high_stress_count'] == sum(s >= manager.high_stress_threshold for s in window)
+
+    analytics = manager.get_session_info(session_id)['analytics']
+    assert analytics['average_stress'] == round(statistics.fmean(scores[-50:]), 3)
+    assert analytics['data_points'] == 50
@@ -0,0 +1,27 @@
+"""
+Tests for the BF16 hardware check
+"""
+import pytest
+import torch
+
+from utils import torch_utils
+
+
+@pytest.fixture
+def torch_21(monkeypatch):
+    """torch.cpu as in the pinned torch 2.1, without the ISA checks"""
+    for name in ('_is_amx_tile_supported', '_is_avx512_bf16_supported'):
+        monkeypatch.delattr(torch.cpu, name, raising=False)
+    torch_utils.cpu_supports_bf16.cache_clear()
+    yield monkeypatch
+    torch_utils.cpu_supports_bf16.cache_clear()
+
+
+def test_falls_back_to_cpu_flags(torch_21):
+    torch_21.setattr(torch_utils, '_cpuinfo_flags', lambda: {'avx2', 'avx512_bf16'})
+    assert torch_utils.cpu_supports_bf16()
+
+
+def test_off_without_native_bf16(torch_21):
+    torch_21.setattr(torch_utils, '_cpuinfo_flags', lambda: {'avx2', 'avx512f'})
+    assert not torch_utils.cpu_supports_bf16()
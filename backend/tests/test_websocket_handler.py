@@ -0,0 +1,191 @@
+"""
+Tests for per-session backpressure and the fused event flow of the WebSocket handler
+Models, Face Mesh and decoding are replaced by stubs; scoring, fusion, sessions and alerts are real
+"""
+import eventlet
+import numpy as np
+import pytest
+from eventlet.semaphore import Semaphore
+from flask import Flask
+
+import config
+import websocket_handler
+from audio_stream.stress_scorer import AudioStressScorer
+from fusion_engine import MultimodalFusion
+from utils import AlertManager, SessionManager
+from video_stream.stress_scorer import VideoStressScorer
+
+
+class StubBatcher:
+    """Stands in for InferenceBatcher; optionally yields so requests overlap"""
+
+    def __init__(self, emotion, delay=0.0):
+        self.emotion = emotion
+        self.delay = delay
+        self.calls = 0
+
+    def submit(self, model_input):
+        self.calls += 1
+        if self.delay:
+            eventlet.sleep(self.delay)
+        probs = np.zeros(len(config.EMOTION_LABELS), dtype=np.float32)
+        probs[config.EMOTION_LABELS.index(self.emotion)] = 1.0
+        return self.emotion, probs, 0.9
+
+
+class StubFeatureExtractor:
+    def extract_features(self, landmarks):
+        return {'avg_eye_openness': 0.3, 'avg_eyebrow_height': 0.05, 'mouth_openness': 0.1}
+
+
+@pytest.fixture
+def events(monkeypatch):
+    """Events the handler emits, as (name, payload) pairs"""
+    emitted = []
+    monkeypatch.setattr(websocket_handler, 'emit', lambda name, payload=None: emitted.append((name, payload)))
+    return emitted
+
+
+@pytest.fixture
+def handler():
+    handler = websocket_handler.WebSocketHandler.__new__(websocket_handler.WebSocketHandler)
+    handler.session_manager = SessionManager()
+    handler.alert_manager = AlertManager()
+    handler.fusion_engine = MultimodalFusion()
+    handler.audio_stress_scorer = AudioStressScorer()
+    handler.video_stress_scorer = VideoStressScorer()
+    handler.video_feature_extractor = StubFeatureExtractor()
+    handler.audio_batcher = StubBatcher('angry')
+    handler.video_batcher = StubBatcher('neutral')
+
+    session_id = handler.session_manager.create_session()
+    handler.sid_to_session = {'sid1': session_id}
+    handler._sessions_by_sid = {'sid1': handler.session_manager.get_session(session_id)}
+
+    handler._prediction_caches = {}
+    handler._retired_cache_stats = {'audio': {'hits': 0, 'misses': 0}, 'video': {'hits': 0, 'misses': 0}}
+    handler._audio_inflight = set()
+    handler._video_inflight = set()
+    handler._last_audio_result = {}
+    handler._last_video_result = {}
+    handler._video_frame_count = {}
+    handler.video_every_k = 1
+    handler._prediction_anchor = {}
+    handler.landmark_reuse_eps = 0.0
+    handler._face_stage = Semaphore(1)
+
+    # Stub the pipeline stages that need models, Face Mesh or JPEG data
+    rng = np.random.default_rng(0)
+    handler._extract_audio_features = lambda audio, session_id: rng.random((10, 39)).astype(np.float32)
+    handler._decode_frame = lambda frame_bytes: np.zeros((180, 240, 3), dtype=np.uint8)
+    handler._detect_face_roi = lambda frame, session_id: (
+        np.zeros((468, 3), dtype=np.float32), rng.random((48, 48)).astype(np.float32), None
+    )
+
+    with Flask(__name__).test_request_context():
+        yield handler
+
+
+AUDIO = {'audio_data': np.zeros(16000, dtype=np.float32).tobytes()}
+FRAME = {'frame_data': b'jpeg'}
+
+
+def names(events):
+    return [name for name, _ in events]
+
+
+def test_busy_audio_session_drops_new_chunk(handler, events):
+    handler.audio_batcher.delay = 0.05
+
+    first = eventlet.spawn(handler.handle_audio_chunk, 'sid1', AUDIO)
+    eventlet.sleep(0)
+    assert handler.handle_audio_chunk('sid1', AUDIO) is None
+    assert first.wait()['emotion'] == 'angry'
+    assert names(events) == ['dropped', 'audio_result']
+    assert events[0][1]['modality'] == 'audio'
+
+    # The slot is released once the chunk finishes
+    assert handler._audio_inflight == set()
+    assert handler.handle_audio_chunk('sid1', AUDIO) is not None
+
+
+def test_busy_video_session_drops_new_frame(handler, events):
+    handler.video_batcher.delay = 0.05
+
+    first = eventlet.spawn(handler.handle_video_frame, 'sid1', FRAME)
+    eventlet.sleep(0)
+    assert handler.handle_video_frame('sid1', FRAME) is None
+    assert first.wait()['face_detected']
+    assert names(events) == ['dropped', 'video_result']
+    assert handler._video_inflight == set()
+
+
+def test_backpressure_is_per_session(handler, events):
+    session_id = handler.session_manager.create_session()
+    handler.sid_to_session['sid2'] = session_id
+    handler.audio_batcher.delay = 0.05
+
+    pool = eventlet.GreenPool()
+    results = list(pool.imap(lambda sid: handler.handle_audio_chunk(sid, AUDIO), ['sid1', 'sid2']))
+    assert all(result is not None for result in results)
+    assert 'dropped' not in names(events)
+
+
+def test_combined_multimodal_emits_one_tick(handler, events):
+    fused = handler.handle_multimodal('sid1', {**AUDIO, **FRAME, 'combined': True})
+
+    assert names(events) == ['tick']
+    tick = events[0][1]
+    assert set(tick) == {'stress', 'session', 'alerts'}
+    assert tick['stress'] is fused
+    assert fused['modalities_used'] == ['audio', 'video']
+    assert tick['session']['total_updates'] == 1
+
+
+def test_multimodal_without_combined_also_emits_modality_results(handler, events):
+    handler.handle_multimodal('sid1', {**AUDIO, **FRAME})
+    assert sorted(names(events)) == ['audio_result', 'tick', 'video_result']
+
+
+def test_legacy_events(handler, events):
+    handler.handle_multimodal('sid1', {**AUDIO, **FRAME, 'combined': True, 'legacy_events': True})
+    assert names(events) == ['stress_update', 'session_update']
+
+
+def test_streamed_frames_fuse_with_last_audio(handler, events):
+    # Audio arrives alone and fuses with no face yet
+    handler.handle_multimodal('sid1', {**AUDIO, 'combined': True})
+    assert names(events) == ['tick']
+    assert events[0][1]['stress']['modalities_used'] == ['audio']
+
+    # Every fused frame gives a tick carrying the last audio result
+    events.clear()
+    for _ in range(3):
+        handler.handle_video_frame('sid1', {**FRAME, 'fuse': True})
+    assert names(events) == ['video_result', 'tick'] * 3
+    for _, payload in events[1::2]:
+        assert payload['stress']['modalities_used'] == ['audio', 'video']
+        assert payload['stress']['audio']['emotion'] == 'angry'
+
+    # Frames without fuse only report the face
+    events.clear()
+    handler.handle_video_frame('sid1', FRAME)
+    assert names(events) == ['video_result']
+
+
+def test_audio_only_multimodal_fuses_with_last_face(handler, events):
+    handler.handle_video_frame('sid1', FRAME)
+    events.clear()
+
+    fused = handler.handle_multimodal('sid1', {**AUDIO, 'combined': True})
+    assert names(events) == ['tick']
+    assert fused['modalities_used'] == ['audio', 'video']
+    assert fused['video']['emotion'] == 'neutral'
+    # The frame was analyzed once, by video_frame
+    assert handler.video_batcher.calls == 1
+
+
+def test_silence_and_no_face_emit_nothing(handler, events):
+    handler._detect_face_roi = lambda frame, session_id: (None, None, None)
+    assert handler.handle_multimodal('sid1', {'silent': True, **FRAME, 'combined': True}) is None
+    assert names(events) == []
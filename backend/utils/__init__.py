@@ -1,8 +1,18 @@
 """Utility modules"""
 from .alert_manager import AlertManager
 from .session_manager import SessionManager
+from .inference_batcher import InferenceBatcher
+from .prediction_cache import PredictionCache, audio_cache_key, face_cache_key
+from .log_setup import setup_logging
+from .scoring import window_weights
 
 __all__ = [
     'AlertManager',
-    'SessionManager'
+    'SessionManager',
+    'InferenceBatcher',
+    'PredictionCache',
+    'audio_cache_key',
+    'face_cache_key',
+    'setup_logging',
+    'window_weights'
 ]
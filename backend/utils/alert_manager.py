@@ -7,6 +7,37 @@ from collections import deque
 import config
 
 
+# Static alert fields; timestamp and message are filled in when an alert fires
+_SUSTAINED_ALERT_TEMPLATE = {
+    'type': 'sustained_high_stress',
+    'severity': 'high',
+    'title': 'Prolonged High Stress Detected',
+    'message': '',
+    'timestamp': 0.0,
+    'recommendations': (
+        'Suggest taking a 5-10 minute break',
+        'Practice deep breathing exercises',
+        'Consider reassigning tasks if workload is overwhelming',
+        'Notify supervisor for support'
+    ),
+    'priority': 'urgent'
+}
+
+_SPIKE_ALERT_TEMPLATE = {
+    'type': 'sudden_stress_spike',
+    'severity': 'medium',
+    'title': 'Sudden Stress Increase Detected',
+    'message': '',
+    'timestamp': 0.0,
+    'recommendations': (
+        'Check if a specific event triggered the stress',
+        'Offer immediate support or intervention',
+        'Monitor closely for the next few minutes'
+    ),
+    'priority': 'high'
+}
+
+
 class AlertManager:
     """Manages stress alerts and notifications"""
     
@@ -15,9 +46,13 @@ class AlertManager:
         self.high_stress_duration = config.ALERT_HIGH_STRESS_DURATION
         self.spike_threshold = config.ALERT_SPIKE_THRESHOLD
         self.spike_window = config.ALERT_SPIKE_WINDOW
+        self._sustained_msg = f'Worker has shown high stress levels for over {self.high_stress_duration // 60} minutes'
         
-        # Track stress history for each session
-        self.session_history = {}
+        self.history_size = 1000  # max entries considered by the sustained-stress check
+        self.spike_history_size = 5  # previous scores averaged by the spike check
+        
+        # Per-session rolling alert state, updated in one pass per check
+        self.session_state = {}
         self.active_alerts = {}
         
     def check_alerts(self, session_id, stress_score, timestamp=None):
@@ -35,56 +70,69 @@ class AlertManager:
         if timestamp is None:
             timestamp = time.time()
         
-        # Initialize session history if needed
-        if session_id not in self.session_history:
-            self.session_history[session_id] = deque(maxlen=1000)
+        # Initialize session state if needed
+        state = self.session_state.get(session_id)
+        if state is None:
+            state = self.session_state[session_id] = {
+                'window': deque(),  # (timestamp, is_high) pairs in the sustained window
+                'high_count': 0,
+                'previous_scores': deque(maxlen=self.spike_history_size)
+            }
             self.active_alerts[session_id] = {}
         
-        # Add current score to history
-        self.session_history[session_id].append({
-            'score': stress_score,
-            'timestamp': timestamp
-        })
+        # Spike delta against the previous scores, before the current one joins them
+        previous_scores = state['previous_scores']
+        spike = None
+        if previous_scores:
+            spike = stress_score - sum(previous_scores) / len(previous_scores)
+        previous_scores.append(stress_score)
+        
+        # Add current score to the sustained-stress window
+        window = state['window']
+        if len(window) == self.history_size:
+            _, was_high = window.popleft()
+            state['high_count'] -= was_high
+        is_high = stress_score >= self.high_stress_threshold
+        window.append((timestamp, is_high))
+        state['high_count'] += is_high
         
         alerts = []
         
         # Check for sustained high stress
-        sustained_alert = self._check_sustained_high_stress(session_id, timestamp)
+        sustained_alert = self._check_sustained_high_stress(session_id, state, timestamp)
         if sustained_alert:
             alerts.append(sustained_alert)
         
         # Check for sudden stress spike
-        spike_alert = self._check_stress_spike(session_id)
-        if spike_alert:
-            alerts.append(spike_alert)
+        if spike is not None:
+            spike_alert = self._check_stress_spike(session_id, spike, timestamp)
+            if spike_alert:
+                alerts.append(spike_alert)
         
         return alerts
     
-    def _check_sustained_high_stress(self, session_id, current_time):
+    def _check_sustained_high_stress(self, session_id, state, current_time):
         """
         Check if stress has been high for sustained period
         
         Args:
             session_id: Session identifier
+            state: Rolling alert state for the session
             current_time: Current timestamp
             
         Returns:
             Alert dictionary if condition met, None otherwise
         """
-        history = self.session_history[session_id]
+        window = state['window']
         
-        # Get entries from last N seconds
+        # Drop entries older than the last N seconds
         cutoff_time = current_time - self.high_stress_duration
-        recent_high = [
-            entry for entry in history
-            if entry['timestamp'] >= cutoff_time and entry['score'] >= self.high_stress_threshold
-        ]
-        
-        # Check if all entries in duration window are high stress
-        total_recent = [entry for entry in history if entry['timestamp'] >= cutoff_time]
+        while window and window[0][0] < cutoff_time:
+            _, was_high = window.popleft()
+            state['high_count'] -= was_high
         
-        if len(total_recent) > 0:
-            high_ratio = len(recent_high) / len(total_recent)
+        if len(window) > 0:
+            high_ratio = state['high_count'] / len(window)
             
             # Alert if >80% of recent entries are high stress
             if high_ratio >= 0.8:
@@ -94,75 +142,44 @@ class AlertManager:
                 if alert_key not in self.active_alerts[session_id]:
                     self.active_alerts[session_id][alert_key] = current_time
                     
-                    return {
-                        'type': 'sustained_high_stress',
-                        'severity': 'high',
-                        'title': 'Prolonged High Stress Detected',
-                        'message': f'Worker has shown high stress levels for over {self.high_stress_duration // 60} minutes',
-                        'timestamp': current_time,
-                        'recommendations': [
-                            'Suggest taking a 5-10 minute break',
-                            'Practice deep breathing exercises',
-                            'Consider reassigning tasks if workload is overwhelming',
-                            'Notify supervisor for support'
-                        ],
-                        'priority': 'urgent'
-                    }
+                    alert = dict(_SUSTAINED_ALERT_TEMPLATE)
+                    alert['message'] = self._sustained_msg
+                    alert['timestamp'] = current_time
+                    return alert
         
         return None
     
-    def _check_stress_spike(self, session_id):
+    def _check_stress_spike(self, session_id, spike, current_time):
         """
         Check for sudden stress spike
         
         Args:
             session_id: Session identifier
+            spike: Current score minus the average of the previous scores
+            current_time: Current timestamp
             
         Returns:
             Alert dictionary if condition met, None otherwise
         """
-        history = list(self.session_history[session_id])
-        
-        if len(history) < 2:
-            return None
-        
-        # Compare current to recent average
-        current = history[-1]['score']
-        
-        # Get scores from spike window
-        window_size = min(5, len(history) - 1)
-        previous_scores = [history[i]['score'] for i in range(-window_size-1, -1)]
-        previous_avg = sum(previous_scores) / len(previous_scores)
-        
-        spike = current - previous_avg
-        
         if spike >= self.spike_threshold:
-            alert_key = f'spike_{int(history[-1]["timestamp"])}'
+            alert_key = 'sudden_stress_spike'
+            last_spike_time = self.active_alerts[session_id].get(alert_key)
             
-            # Only trigger once per spike
-            if alert_key not in self.active_alerts[session_id]:
-                self.active_alerts[session_id][alert_key] = history[-1]['timestamp']
+            # Only trigger once per spike window
+            if last_spike_time is None or current_time - last_spike_time >= self.spike_window:
+                self.active_alerts[session_id][alert_key] = current_time
                 
-                return {
-                    'type': 'sudden_stress_spike',
-                    'severity': 'medium',
-                    'title': 'Sudden Stress Increase Detected',
-                    'message': f'Stress level increased by {spike:.2f} in a short period',
-                    'timestamp': history[-1]['timestamp'],
-                    'recommendations': [
-                        'Check if a specific event triggered the stress',
-                        'Offer immediate support or intervention',
-                        'Monitor closely for the next few minutes'
-                    ],
-                    'priority': 'high'
-                }
+                alert = dict(_SPIKE_ALERT_TEMPLATE)
+                alert['message'] = f'Stress level increased by {spike:.2f} in a short period'
+                alert['timestamp'] = current_time
+                return alert
         
         return None
     
     def clear_session(self, session_id):
         """Clear history and alerts for a session"""
-        if session_id in self.session_history:
-            del self.session_history[session_id]
+        if session_id in self.session_state:
+            del self.session_state[session_id]
         if session_id in self.active_alerts:
             del self.active_alerts[session_id]
     
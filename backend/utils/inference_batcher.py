@@ -0,0 +1,75 @@
+"""
+Inference Batcher
+Coalesces concurrent model predictions into batched forward passes
+"""
+import time
+import eventlet
+from eventlet.event import Event
+from eventlet.queue import Queue, Empty
+
+
+class InferenceBatcher:
+    """Micro-batches inference requests arriving within a short time window"""
+    
+    def __init__(self, predict_batch_fn, window=0.02, max_batch_size=16):
+        """
+        Args:
+            predict_batch_fn: Callable mapping a list of inputs to a list of predictions
+            window: Seconds to wait for more requests after the first one arrives
+            max_batch_size: Maximum number of inputs per forward pass
+        """
+        self.predict_batch_fn = predict_batch_fn
+        self.window = window
+        self.max_batch_size = max_batch_size
+        
+        self._queue = Queue()
+        self._worker = None
+        
+    def submit(self, item):
+        """
+        Queue an input and wait for its prediction
+        Only the calling greenlet blocks; other sessions keep being serviced
+        
+        Args:
+            item: Single model input
+            
+        Returns:
+            Prediction for the input
+        """
+        if self._worker is None:
+            self._worker = eventlet.spawn(self._run)
+        
+        done = Event()
+        self._queue.put((item, done))
+        return done.wait()
+    
+    def _run(self):
+        """Drain the queue in batches and dispatch results to waiting callers"""
+        while True:
+            batch = [self._queue.get()]
+            
+            # Collect more requests until the window closes or the batch is full
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except Empty:
+                    break
+            
+            # Dispatch without waiting so several batches can be in flight
+            eventlet.spawn_n(self._dispatch, batch)
+    
+    def _dispatch(self, batch):
+        """Run one batch and send each prediction to its waiting caller"""
+        try:
+            predictions = self.predict_batch_fn([item for item, _ in batch])
+        except Exception as e:
+            for _, done in batch:
+                done.send_exception(e)
+            return
+        
+        for (_, done), prediction in zip(batch, predictions):
+            done.send(prediction)
@@ -0,0 +1,35 @@
+"""
+Log Setup
+Routes log records through a queue so event handlers never block on console I/O
+"""
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+import config
+
+
+def setup_logging(level=config.LOG_LEVEL):
+    """
+    Configure the root logger to enqueue records; a background thread writes them to stderr
+
+    Args:
+        level: Root log level (name or number)
+
+    Returns:
+        The started QueueListener (stopped automatically at exit)
+    """
+    log_queue = queue.Queue(-1)
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+
+    root = logging.getLogger()
+    root.handlers[:] = [QueueHandler(log_queue)]
+    root.setLevel(level)
+
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    return listener
@@ -0,0 +1,195 @@
+"""
+ONNX Export
+Exports the emotion models to ONNX, quantizes them to INT8 and opens ONNX Runtime sessions
+"""
+import logging
+from pathlib import Path
+import cv2
+import numpy as np
+import torch
+import config
+
+log = logging.getLogger(__name__)
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+try:
+    from onnxruntime.quantization import (
+        CalibrationDataReader,
+        QuantFormat,
+        QuantType,
+        quantize_dynamic,
+        quantize_static
+    )
+except ImportError:
+    CalibrationDataReader = object
+    quantize_dynamic = None
+    quantize_static = None
+
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+
+class FaceCalibrationReader(CalibrationDataReader):
+    """Feeds 48x48 grayscale face crops to the static quantization calibrator"""
+
+    def __init__(self, image_dir, input_name='x', max_images=200):
+        """
+        Args:
+            image_dir: Directory of face images (any size, color or grayscale)
+            input_name: Name of the ONNX model input
+            max_images: Maximum number of images used for calibration
+        """
+        self.input_name = input_name
+        self.paths = sorted(
+            p for p in Path(image_dir).iterdir()
+            if p.suffix.lower() in IMAGE_EXTENSIONS
+        )[:max_images]
+        self._iter = iter(self.paths)
+
+    def get_next(self):
+        """Return the next calibration input, or None when exhausted"""
+        for path in self._iter:
+            image = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+            if image is None:
+                continue
+
+            # Same preprocessing as FaceDetector.extract_face_roi
+            face = cv2.resize(image, (48, 48)).astype(np.float32) / 255.0
+            return {self.input_name: face[None, None]}
+
+        return None
+
+
+def export_onnx(model, onnx_path, example_input):
+    """
+    Export an eval-mode emotion model to ONNX with a dynamic batch axis
+
+    Args:
+        model: Eval-mode FP32 model
+        onnx_path: Output path for the FP32 ONNX model
+        example_input: Example input tensor with batch size 1, on the model's device
+    """
+    Path(onnx_path).parent.mkdir(parents=True, exist_ok=True)
+
+    torch.onnx.export(
+        model,
+        example_input,
+        str(onnx_path),
+        opset_version=17,
+        input_names=['x'],
+        output_names=['y'],
+        dynamic_axes={'x': {0: 'N'}, 'y': {0: 'N'}}
+    )
+
+
+def quantize_int8(fp32_path, int8_path, calibration_dir):
+    """
+    Statically quantize an ONNX model to INT8 (QDQ format)
+
+    Args:
+        fp32_path: Path to the FP32 ONNX model
+        int8_path: Output path for the quantized model
+        calibration_dir: Directory of face images for activation calibration
+
+    Returns:
+        True if the quantized model was written, False otherwise
+    """
+    if quantize_static is None:
+        log.warning("onnxruntime.quantization not available, skipping INT8 quantization")
+        return False
+
+    if not calibration_dir or not Path(calibration_dir).is_dir():
+        log.warning("No calibration images at %s, skipping static INT8 quantization", calibration_dir)
+        return False
+
+    reader = FaceCalibrationReader(calibration_dir)
+    if not reader.paths:
+        log.warning("No calibration images at %s, skipping static INT8 quantization", calibration_dir)
+        return False
+
+    try:
+        quantize_static(
+            str(fp32_path),
+            str(int8_path),
+            calibration_data_reader=reader,
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8
+        )
+        return True
+    except Exception as e:
+        log.warning("Static INT8 quantization of %s failed: %s", fp32_path, e)
+        return False
+
+
+def quantize_int8_dynamic(fp32_path, int8_path, op_types=None):
+    """
+    Dynamically quantize an ONNX model to INT8 (INT8 weights, activations quantized at run time)
+    Needs no calibration data; on VNNI CPUs the INT8 MatMuls use vpdpbusd
+
+    Args:
+        fp32_path: Path to the FP32 ONNX model
+        int8_path: Output path for the quantized model
+        op_types: Op types to quantize (None quantizes every supported op)
+
+    Returns:
+        True if the quantized model was written, False otherwise
+    """
+    if quantize_dynamic is None:
+        log.warning("onnxruntime.quantization not available, skipping INT8 quantization")
+        return False
+
+    try:
+        quantize_dynamic(
+            str(fp32_path),
+            str(int8_path),
+            op_types_to_quantize=op_types,
+            weight_type=QuantType.QInt8
+        )
+        return True
+    except Exception as e:
+        log.warning("Dynamic INT8 quantization of %s failed: %s", fp32_path, e)
+        return False
+
+
+def is_stale(artifact_path, *source_paths):
+    """
+    Check whether an exported artifact is missing or older than any of its sources
+
+    Args:
+        artifact_path: Path of the generated file
+        source_paths: Files the artifact is built from (missing ones are ignored)
+
+    Returns:
+        True if the artifact needs rebuilding
+    """
+    artifact_path = Path(artifact_path)
+    if not artifact_path.exists():
+        return True
+
+    artifact_mtime = artifact_path.stat().st_mtime
+    return any(
+        Path(p).stat().st_mtime > artifact_mtime
+        for p in source_paths if p and Path(p).exists()
+    )
+
+
+def create_session(onnx_path):
+    """
+    Open a CPU ONNX Runtime session with full graph optimization
+    Intra-op threads match TORCH_NUM_THREADS (sessions run concurrently on the thread pool)
+
+    Args:
+        onnx_path: Path to the ONNX model
+
+    Returns:
+        onnxruntime.InferenceSession
+    """
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.intra_op_num_threads = config.TORCH_NUM_THREADS
+    return ort.InferenceSession(str(onnx_path), options, providers=['CPUExecutionProvider'])
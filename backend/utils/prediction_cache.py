@@ -0,0 +1,99 @@
+"""
+Prediction Cache
+LRU cache of emotion predictions keyed by quantized model inputs
+Keys hold the full quantized bytes (not a hash of them), so two different inputs never
+share an entry; the handler keeps one cache per session and modality
+"""
+from collections import OrderedDict
+import cv2
+import numpy as np
+
+
+def audio_cache_key(feature_vector):
+    """
+    Cache key for an audio model input
+
+    Args:
+        feature_vector: Numpy array of shape (time_frames, features)
+
+    Returns:
+        Tuple of the shape and the bytes of the features rounded to 2 decimals
+    """
+    # Adding 0.0 turns -0.0 into 0.0 so both zeros give the same bytes
+    return feature_vector.shape, (np.round(feature_vector, 2) + 0.0).tobytes()
+
+
+def face_cache_key(face_roi):
+    """
+    Cache key for a video model input
+
+    Args:
+        face_roi: 48x48 grayscale face image normalized to [0, 1]
+
+    Returns:
+        Bytes of the face downsampled to 16x16 uint8
+    """
+    thumb = cv2.resize(face_roi, (16, 16), interpolation=cv2.INTER_AREA)
+    return np.multiply(thumb, 255).astype(np.uint8).tobytes()
+
+
+class PredictionCache:
+    """Least-recently-used cache of (emotion, probabilities, confidence) predictions"""
+
+    def __init__(self, capacity=1024):
+        """
+        Args:
+            capacity: Maximum number of cached predictions
+        """
+        self.capacity = capacity
+        self._entries = OrderedDict()
+
+        # Observability counters
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        Look up a prediction and mark it most recently used
+
+        Args:
+            key: Cache key (see audio_cache_key / face_cache_key)
+
+        Returns:
+            Cached prediction, or None on a miss
+        """
+        prediction = self._entries.get(key)
+        if prediction is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return prediction
+
+    def put(self, key, prediction):
+        """
+        Store a prediction, evicting the least recently used one when full
+
+        Args:
+            key: Cache key
+            prediction: Model prediction to cache
+        """
+        self._entries[key] = prediction
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_stats(self):
+        """Get hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self._entries),
+            'capacity': self.capacity
+        }
@@ -0,0 +1,23 @@
+"""
+Scoring Utilities
+Helpers shared by the audio and video stress scorers
+"""
+import functools
+import numpy as np
+
+
+@functools.lru_cache(maxsize=32)
+def window_weights(n):
+    """
+    Normalized exponential weights for a window of scores (more recent = higher weight)
+
+    Args:
+        n: Number of scores in the window
+
+    Returns:
+        Read-only float64 array of n weights summing to 1 (shared between callers)
+    """
+    w = np.exp(np.linspace(0, 1, n))
+    w /= w.sum()
+    w.flags.writeable = False
+    return w
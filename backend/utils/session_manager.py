@@ -2,18 +2,35 @@
 Session Manager
 Manages session data and analytics
 """
+import os
 import time
-import uuid
 from collections import deque
+from itertools import count, islice
 import config
 
 
+class HistoryEntry:
+    """Compact stress history record (slots instead of a per-entry dict)"""
+    
+    __slots__ = ('timestamp', 'stress_score', 'stress_level', 'emotion', 'modalities')
+    
+    def __init__(self, timestamp, stress_score, stress_level, emotion, modalities):
+        self.timestamp = timestamp
+        self.stress_score = stress_score
+        self.stress_level = stress_level
+        self.emotion = emotion
+        self.modalities = modalities
+
+
 class SessionManager:
     """Manages worker sessions and stress analytics"""
     
     def __init__(self):
         self.sessions = {}
         self.max_history = config.SESSION_MAX_HISTORY
+        self.high_stress_threshold = config.STRESS_HIGH_THRESHOLD
+        self.alert_threshold = config.ALERT_HIGH_STRESS_THRESHOLD
+        self._session_counter = count()
         
     def create_session(self, worker_id=None):
         """
@@ -25,7 +42,9 @@ class SessionManager:
         Returns:
             Session ID
         """
-        session_id = str(uuid.uuid4())
+        # Random prefix (also used for the default worker_id) plus a process-local counter;
+        # ids only need to be unique, not cryptographically strong like uuid4
+        session_id = f'{os.urandom(4).hex()}-{next(self._session_counter):08x}'
         
         self.sessions[session_id] = {
             'session_id': session_id,
@@ -34,6 +53,13 @@ class SessionManager:
             'stress_history': deque(maxlen=self.max_history),
             'emotion_counts': {},
             'total_updates': 0,
+            # Running aggregates over stress_history (Welford mean/SSD, sliding min/max)
+            'running_count': 0,
+            'running_mean': 0.0,
+            'running_ssd': 0.0,
+            'running_max': deque(),  # non-increasing candidates for the window max
+            'running_min': deque(),  # non-decreasing candidates for the window min
+            'high_stress_count': 0,
             'current_stress': 0.5,
             'current_emotion': 'neutral',
             'status': 'active'
@@ -41,6 +67,18 @@ class SessionManager:
         
         return session_id
     
+    def get_session(self, session_id):
+        """
+        Get the session record itself, for callers that keep it to skip per-event lookups
+        
+        Args:
+            session_id: Session identifier
+            
+        Returns:
+            Session dictionary, or None if unknown
+        """
+        return self.sessions.get(session_id)
+    
     def update_session(self, session_id, fused_result):
         """
         Update session with new stress analysis result
@@ -56,8 +94,19 @@ class SessionManager:
             # Create session if it doesn't exist
             session_id = self.create_session()
         
-        session = self.sessions[session_id]
+        return self.update_session_record(self.sessions[session_id], fused_result)
+    
+    def update_session_record(self, session, fused_result):
+        """
+        Update a session record (from get_session) with new stress analysis result
         
+        Args:
+            session: Session dictionary
+            fused_result: Fused stress analysis result
+            
+        Returns:
+            Updated session info
+        """
         # Extract data from fused result
         stress_score = fused_result.get('stress_score', 0.5)
         stress_level = fused_result.get('stress_level', 'Medium')
@@ -67,14 +116,20 @@ class SessionManager:
         video_emotion = fused_result.get('video', {}).get('emotion', 'neutral')
         primary_emotion = audio_emotion  # Prefer audio emotion
         
+        # Remove the entry the history deque is about to evict from the running stats
+        history = session['stress_history']
+        if len(history) == history.maxlen:
+            self._remove_running_stats(session, history[0].stress_score)
+        self._add_running_stats(session, stress_score)
+        
         # Add to history
-        session['stress_history'].append({
-            'timestamp': time.time(),
-            'stress_score': stress_score,
-            'stress_level': stress_level,
-            'emotion': primary_emotion,
-            'modalities': fused_result.get('modalities_used', [])
-        })
+        history.append(HistoryEntry(
+            time.time(),
+            stress_score,
+            stress_level,
+            primary_emotion,
+            tuple(fused_result.get('modalities_used', ()))
+        ))
         
         # Update emotion counts
         if primary_emotion in session['emotion_counts']:
@@ -87,13 +142,12 @@ class SessionManager:
         session['current_emotion'] = primary_emotion
         session['total_updates'] += 1
         
-        # Determine status
-        if stress_score >= config.ALERT_HIGH_STRESS_THRESHOLD:
-            session['status'] = 'at_risk'
-        else:
-            session['status'] = 'normal'
+        # Determine status, writing it only on a transition
+        new_status = 'at_risk' if stress_score >= self.alert_threshold else 'normal'
+        if new_status != session['status']:
+            session['status'] = new_status
         
-        return self.get_session_info(session_id)
+        return self.session_record_info(session)
     
     def get_session_info(self, session_id):
         """
@@ -108,8 +162,18 @@ class SessionManager:
         if session_id not in self.sessions:
             return None
         
-        session = self.sessions[session_id]
+        return self.session_record_info(self.sessions[session_id])
+    
+    def session_record_info(self, session):
+        """
+        Get comprehensive information for a session record
         
+        Args:
+            session: Session dictionary
+            
+        Returns:
+            Dictionary with session info and analytics
+        """
         # Calculate session duration
         duration = time.time() - session['start_time']
         
@@ -138,7 +202,12 @@ class SessionManager:
         Returns:
             Analytics dictionary
         """
-        history = list(session['stress_history'])
+        # Analytics only change in update_session, which bumps total_updates
+        cache = session.get('_analytics_cache')
+        if cache is not None and cache[0] == session['total_updates']:
+            return cache[1]
+        
+        history = session['stress_history']
         
         if not history:
             return {
@@ -150,29 +219,23 @@ class SessionManager:
                 'high_stress_percentage': 0.0
             }
         
-        # Extract stress scores
-        stress_scores = [entry['stress_score'] for entry in history]
-        
-        # Calculate statistics
-        avg_stress = sum(stress_scores) / len(stress_scores)
-        peak_stress = max(stress_scores)
-        min_stress = min(stress_scores)
-        
-        # Calculate variance
-        variance = sum((x - avg_stress) ** 2 for x in stress_scores) / len(stress_scores)
-        
-        # Calculate high stress percentage
-        high_stress_count = sum(1 for score in stress_scores if score >= config.STRESS_HIGH_THRESHOLD)
-        high_stress_pct = (high_stress_count / len(stress_scores)) * 100
+        # Read the running aggregates maintained by update_session
+        n = session['running_count']
+        avg_stress = session['running_mean']
+        peak_stress = session['running_max'][0]
+        min_stress = session['running_min'][0]
+        variance = max(session['running_ssd'], 0.0) / n
+        high_stress_pct = (session['high_stress_count'] / n) * 100
         
         # Calculate emotion distribution
-        total_emotions = sum(session['emotion_counts'].values())
+        # Every update adds exactly one emotion count, so the total is total_updates
+        inv_total = 100.0 / session['total_updates']
         emotion_dist = {
-            emotion: (count / total_emotions) * 100
+            emotion: count * inv_total
             for emotion, count in session['emotion_counts'].items()
         }
         
-        return {
+        analytics = {
             'average_stress': round(avg_stress, 3),
             'peak_stress': round(peak_stress, 3),
             'min_stress': round(min_stress, 3),
@@ -181,6 +244,65 @@ class SessionManager:
             'high_stress_percentage': round(high_stress_pct, 1),
             'data_points': len(history)
         }
+        session['_analytics_cache'] = (session['total_updates'], analytics)
+        
+        return analytics
+    
+    def _add_running_stats(self, session, score):
+        """
+        Add a stress score to the running aggregates (Welford update)
+        
+        Args:
+            session: Session dictionary
+            score: Stress score being appended to the history
+        """
+        session['running_count'] += 1
+        delta = score - session['running_mean']
+        session['running_mean'] += delta / session['running_count']
+        session['running_ssd'] += delta * (score - session['running_mean'])
+        
+        if score >= self.high_stress_threshold:
+            session['high_stress_count'] += 1
+        
+        # Monotonic deques: drop candidates the new score dominates
+        max_q = session['running_max']
+        while max_q and max_q[-1] < score:
+            max_q.pop()
+        max_q.append(score)
+        
+        min_q = session['running_min']
+        while min_q and min_q[-1] > score:
+            min_q.pop()
+        min_q.append(score)
+    
+    def _remove_running_stats(self, session, score):
+        """
+        Remove the oldest stress score from the running aggregates (reverse Welford)
+        
+        Args:
+            session: Session dictionary
+            score: Stress score being evicted from the front of the history
+        """
+        count = session['running_count'] - 1
+        if count == 0:
+            session['running_count'] = 0
+            session['running_mean'] = 0.0
+            session['running_ssd'] = 0.0
+        else:
+            old_mean = session['running_mean']
+            new_mean = old_mean + (old_mean - score) / count
+            session['running_ssd'] -= (score - old_mean) * (score - new_mean)
+            session['running_mean'] = new_mean
+            session['running_count'] = count
+        
+        if score >= self.high_stress_threshold:
+            session['high_stress_count'] -= 1
+        
+        # The evicted score is only still a candidate if it heads the deque
+        if session['running_max'] and session['running_max'][0] == score:
+            session['running_max'].popleft()
+        if session['running_min'] and session['running_min'][0] == score:
+            session['running_min'].popleft()
     
     def get_stress_timeline(self, session_id, limit=100):
         """
@@ -196,17 +318,34 @@ class SessionManager:
         if session_id not in self.sessions:
             return []
         
-        history = list(self.sessions[session_id]['stress_history'])
+        return self.session_record_timeline(self.sessions[session_id], limit)
+    
+    def session_record_timeline(self, session, limit=100):
+        """
+        Get stress timeline for a session record
+        
+        Args:
+            session: Session dictionary
+            limit: Maximum number of data points (0 or less returns the whole history)
+            
+        Returns:
+            List of timeline data points
+        """
+        history = session['stress_history']
+        limit = max(0, int(limit))
         
-        # Return last N points
-        recent = history[-limit:] if len(history) > limit else history
+        # Return last N points, walking back from the end instead of copying the whole deque
+        if limit == 0 or limit >= len(history):
+            recent = history
+        else:
+            recent = reversed(list(islice(reversed(history), limit)))
         
         return [
             {
-                'timestamp': entry['timestamp'],
-                'stress_score': entry['stress_score'],
-                'stress_level': entry['stress_level'],
-                'emotion': entry['emotion']
+                'timestamp': entry.timestamp,
+                'stress_score': entry.stress_score,
+                'stress_level': entry.stress_level,
+                'emotion': entry.emotion
             }
             for entry in recent
         ]
@@ -224,9 +363,8 @@ class SessionManager:
     
     def _format_duration(self, seconds):
         """Format duration in human-readable format"""
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
+        hours, rem = divmod(int(seconds), 3600)
+        minutes, secs = divmod(rem, 60)
         
         if hours > 0:
             return f"{hours}h {minutes}m {secs}s"
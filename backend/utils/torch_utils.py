@@ -0,0 +1,39 @@
+"""
+Torch Utilities
+Hardware checks shared by the emotion models
+"""
+from functools import lru_cache
+import torch
+
+# /proc/cpuinfo flags of CPUs with native BF16 compute
+_BF16_CPU_FLAGS = {'avx512_bf16', 'amx_bf16'}
+
+
+def _cpuinfo_flags():
+    """Get the CPU feature flags from /proc/cpuinfo (empty off Linux)"""
+    try:
+        with open('/proc/cpuinfo') as f:
+            for line in f:
+                if line.startswith('flags'):
+                    return set(line.split(':', 1)[1].split())
+    except OSError:
+        pass
+    return set()
+
+
+@lru_cache(maxsize=None)
+def cpu_supports_bf16():
+    """
+    Check for native BF16 compute (AVX512-BF16 or AMX)
+    Without it oneDNN emulates BF16 and autocast is slower than FP32
+
+    torch.cpu only gained the ISA checks after 2.1 (the pinned version), so the Linux
+    CPU flags are read when they are missing; elsewhere BF16 autocast stays off
+
+    Returns:
+        True if BF16 autocast on this CPU is worth enabling
+    """
+    checks = [getattr(torch.cpu, name, None) for name in ('_is_amx_tile_supported', '_is_avx512_bf16_supported')]
+    if any(check is not None for check in checks):
+        return any(check is not None and check() for check in checks)
+    return bool(_cpuinfo_flags() & _BF16_CPU_FLAGS)
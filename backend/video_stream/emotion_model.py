@@ -2,27 +2,44 @@
 Video Emotion Model
 CNN model for facial emotion recognition
 """
+import logging
+import threading
 import numpy as np
 import torch
 import torch.nn as nn
+from torch.nn.utils.fusion import fuse_conv_bn_eval
 import config
+from utils.onnx_export import (
+    ort,
+    create_session,
+    export_onnx,
+    is_stale,
+    quantize_int8,
+    quantize_int8_dynamic
+)
+from utils.torch_utils import cpu_supports_bf16
+
+log = logging.getLogger(__name__)
 
 
 class VideoEmotionCNN(nn.Module):
     """
     CNN architecture for facial emotion recognition
     Input: 48x48 grayscale face image
-    Output: Emotion probabilities (7 classes)
+    Output: Emotion logits (7 classes), softmax is applied by VideoEmotionModel
     """
     
-    def __init__(self, num_classes=7):
+    def __init__(self, num_classes=7, head='fc'):
         """
         Args:
             num_classes: Number of emotion classes
+            head: 'fc' flattens the 512x3x3 feature map into a 4608 -> 512 -> 256 classifier;
+                'gap' global-average-pools it into a 512 -> 256 classifier (~2.4M fewer weights)
         """
         super(VideoEmotionCNN, self).__init__()
         
         self.num_classes = num_classes
+        self.head = head
         
         # Convolutional blocks
         # Block 1
@@ -54,17 +71,28 @@ class VideoEmotionCNN(nn.Module):
         self.dropout4 = nn.Dropout2d(0.25)
         
         # Fully connected layers
-        self.flatten = nn.Flatten()
-        self.fc1 = nn.Linear(512 * 3 * 3, 512)
-        self.relu5 = nn.ReLU()
-        self.dropout5 = nn.Dropout(0.5)
-        
-        self.fc2 = nn.Linear(512, 256)
-        self.relu6 = nn.ReLU()
-        self.dropout6 = nn.Dropout(0.5)
+        if head == 'gap':
+            self.gap = nn.AdaptiveAvgPool2d(1)  # 3x3 -> 1x1
+            self.flatten = nn.Flatten()
+            self.fc1 = nn.Linear(512, 256)
+            self.relu5 = nn.ReLU()
+            self.dropout5 = nn.Dropout(0.5)
+            
+            self.fc2 = nn.Identity()
+            self.relu6 = nn.Identity()
+            self.dropout6 = nn.Identity()
+        else:
+            self.gap = nn.Identity()
+            self.flatten = nn.Flatten()
+            self.fc1 = nn.Linear(512 * 3 * 3, 512)
+            self.relu5 = nn.ReLU()
+            self.dropout5 = nn.Dropout(0.5)
+            
+            self.fc2 = nn.Linear(512, 256)
+            self.relu6 = nn.ReLU()
+            self.dropout6 = nn.Dropout(0.5)
         
         self.fc3 = nn.Linear(256, num_classes)
-        self.softmax = nn.Softmax(dim=1)
         
     def forward(self, x):
         """
@@ -74,7 +102,7 @@ class VideoEmotionCNN(nn.Module):
             x: Input tensor of shape (batch, 1, 48, 48)
             
         Returns:
-            Emotion probabilities (batch, num_classes)
+            Emotion logits (batch, num_classes)
         """
         # Convolutional blocks
         x = self.dropout1(self.pool1(self.relu1(self.bn1(self.conv1(x)))))
@@ -83,11 +111,10 @@ class VideoEmotionCNN(nn.Module):
         x = self.dropout4(self.pool4(self.relu4(self.bn4(self.conv4(x)))))
         
         # Fully connected layers
-        x = self.flatten(x)
+        x = self.flatten(self.gap(x))
         x = self.dropout5(self.relu5(self.fc1(x)))
         x = self.dropout6(self.relu6(self.fc2(x)))
         x = self.fc3(x)
-        x = self.softmax(x)
         
         return x
 
@@ -105,67 +132,315 @@ class VideoEmotionModel:
         """
         self.device = torch.device(device)
         self.model = VideoEmotionCNN(
-            num_classes=len(config.EMOTION_LABELS)
+            num_classes=len(config.EMOTION_LABELS),
+            head=config.VIDEO_MODEL_HEAD
         ).to(self.device)
         
         # Load pre-trained weights if available
         if model_path and model_path.exists():
             try:
                 self.model.load_state_dict(torch.load(model_path, map_location=self.device))
-                print(f"Loaded video emotion model from {model_path}")
+                log.info("Loaded video emotion model from %s", model_path)
             except Exception as e:
-                print(f"Could not load model weights: {e}")
-                print("Using randomly initialized weights (for demo purposes)")
+                log.warning("Could not load model weights: %s", e)
+                log.warning("Using randomly initialized weights (for demo purposes)")
         else:
-            print("No pre-trained model found. Using randomly initialized weights.")
-            print("Note: In production, you should train or download a pre-trained model.")
+            log.warning("No pre-trained model found. Using randomly initialized weights.")
+            log.warning("Note: In production, you should train or download a pre-trained model.")
         
         self.model.eval()  # Set to evaluation mode
         
-    def predict(self, face_image):
+        # Fold BatchNorm into the convolutions so every backend sees the leaner graph
+        if config.VIDEO_MODEL_FUSE_BN:
+            self._fuse_for_inference(self.model)
+        
+        # Serve through ONNX Runtime (static INT8 when calibration images exist)
+        self.session = None
+        if config.VIDEO_MODEL_ONNX and self.device.type == 'cpu':
+            self.session = self._load_onnx_session(model_path)
+        
+        # Reduced precision for the PyTorch path: FP16 weights on CUDA, BF16 autocast on CPU
+        self._input_dtype = torch.float32
+        self._autocast_dtype = None
+        if self.session is None and config.VIDEO_MODEL_HALF_PRECISION:
+            if self.device.type == 'cuda':
+                self.model.half()
+                self._input_dtype = torch.float16
+            elif cpu_supports_bf16():
+                self._autocast_dtype = torch.bfloat16
+        
+        # Per-thread input/output buffers (CUDA staging pair, ORT IOBinding); predictions run
+        # concurrently on the server's thread pool, so each thread gets its own
+        self._staging = threading.local()
+        
+        # PyTorch path: frozen TorchScript module; self.model stays eager for export/training
+        self._torch_model = self.model
+        if self.session is None and config.VIDEO_MODEL_JIT:
+            self._torch_model = self._trace_for_inference(self.model)
+        
+        # The traced and ONNX paths warm up when built; warm up the eager path here so
+        # lazy kernel selection doesn't land on the first real frame
+        if self.session is None and self._torch_model is self.model:
+            example = torch.zeros(1, 1, 48, 48, device=self.device, dtype=self._input_dtype)
+            with torch.inference_mode():
+                self._forward(example)
+                self._forward(example)
+        
+    def _fuse_for_inference(self, model):
+        """
+        Fold each eval-mode BatchNorm into its preceding Conv and replace Dropout with Identity
+        Changes the module in place; the state_dict no longer matches the training layout
+        
+        Args:
+            model: Eval-mode VideoEmotionCNN with weights loaded
+        """
+        with torch.no_grad():
+            for i in range(1, 5):
+                conv = getattr(model, f'conv{i}')
+                bn = getattr(model, f'bn{i}')
+                setattr(model, f'conv{i}', fuse_conv_bn_eval(conv, bn))
+                setattr(model, f'bn{i}', nn.Identity())
+        
+        for name, module in list(model.named_children()):
+            if isinstance(module, (nn.Dropout, nn.Dropout2d)):
+                setattr(model, name, nn.Identity())
+    
+    def _load_onnx_session(self, model_path):
+        """
+        Export the model to ONNX (quantizing it if possible) and open an inference session
+        
+        Args:
+            model_path: Path to the PyTorch weights the ONNX graph is built from
+            
+        Returns:
+            onnxruntime.InferenceSession, or None to keep using PyTorch
+        """
+        if ort is None:
+            log.warning("onnxruntime not installed, using PyTorch video model")
+            return None
+        
+        try:
+            onnx_path = self._build_onnx(model_path)
+            session = create_session(onnx_path)
+            
+            # Warm up so kernel selection doesn't land on the first real frame
+            session.run(None, {'x': np.zeros((1, 1, 48, 48), dtype=np.float32)})
+            
+            log.info("Serving video emotion model with ONNX Runtime from %s", onnx_path)
+            return session
+        except Exception as e:
+            log.warning("ONNX Runtime setup failed, using PyTorch video model: %s", e)
+            return None
+    
+    def _build_onnx(self, model_path):
+        """
+        Re-export / re-quantize the ONNX artifacts when they are older than their source
+        
+        Args:
+            model_path: Path to the PyTorch weights
+            
+        Returns:
+            Path of the model to serve (static or dynamic INT8 if available, else FP32)
+        """
+        fp32_path = config.VIDEO_ONNX_PATH
+        int8_path = config.VIDEO_ONNX_INT8_PATH
+        
+        # The graph also depends on the architecture defined in this file and the configured head
+        if is_stale(fp32_path, __file__, config.__file__, model_path):
+            export_onnx(self.model, fp32_path, torch.zeros(1, 1, 48, 48, device=self.device))
+        
+        # Adding calibration images (directory mtime) triggers a static re-quantization
+        if not is_stale(int8_path, fp32_path, config.VIDEO_CALIBRATION_DIR):
+            return int8_path
+        if quantize_int8(fp32_path, int8_path, config.VIDEO_CALIBRATION_DIR):
+            return int8_path
+        
+        # Without calibration data, dynamically quantize the fully connected layers only;
+        # ONNX Runtime's dynamic INT8 convolutions are slower than its FP32 ones
+        if quantize_int8_dynamic(fp32_path, int8_path, op_types=['MatMul', 'Gemm']):
+            return int8_path
+        
+        return fp32_path
+        
+    def _trace_for_inference(self, model):
+        """
+        Trace, freeze and optimize the model for inference
+        Freezing folds BatchNorm into Conv and drops eval-mode Dropout
+        
+        Args:
+            model: Eval-mode VideoEmotionCNN
+            
+        Returns:
+            Frozen TorchScript module, or the eager model if tracing fails
+        """
+        try:
+            example = torch.zeros(1, 1, 48, 48, device=self.device, dtype=self._input_dtype)
+            with torch.inference_mode():
+                traced = torch.jit.trace(model, example)
+                traced = torch.jit.optimize_for_inference(torch.jit.freeze(traced))
+                
+                # Two warmup runs so JIT profiling/specialization happens before real frames
+                self._forward(example, traced)
+                self._forward(example, traced)
+            
+            return traced
+        except Exception as e:
+            log.warning("TorchScript compilation failed, using eager video model: %s", e)
+            return model
+    
+    def predict(self, face_image, return_probs=True):
         """
         Predict emotion from face image
         
         Args:
             face_image: Grayscale face image (48x48 numpy array, normalized [0,1])
+            return_probs: Whether to compute the probability array
             
         Returns:
-            Tuple of (predicted_emotion, probabilities, confidence)
+            Tuple of (predicted_emotion, probabilities, confidence); probabilities is a
+            float32 array ordered as config.EMOTION_LABELS, None when return_probs is False
         """
-        with torch.no_grad():
-            # Convert to tensor and add batch and channel dimensions
-            # Shape: (1, 1, 48, 48)
-            x = torch.FloatTensor(face_image).unsqueeze(0).unsqueeze(0).to(self.device)
-            
-            # Forward pass
-            probabilities = self.model(x)
+        if self.session is not None:
+            # Copy into this thread's bound (1, 1, 48, 48) input; the run writes into the bound output
+            binding, x, y = self._ort_binding()
+            x[0, 0] = face_image
+            self.session.run_with_iobinding(binding)
+            logits = y[0].copy()
+        else:
+            with torch.inference_mode():
+                # Add batch and channel dimensions and move to the model device
+                # Shape: (1, 1, 48, 48)
+                x = self._to_device(np.asarray(face_image, dtype=np.float32)[None, None])
+                
+                # Forward pass
+                logits = self._forward(x).cpu().numpy()[0]
+        
+        return self._format_prediction(logits, return_probs)
+    
+    def _ort_binding(self):
+        """
+        Get this thread's ONNX Runtime IOBinding for single-frame inference
+        Input and output are bound to reusable numpy buffers, so per-frame runs don't
+        allocate; predictions run concurrently on the server's thread pool, so each
+        thread binds its own buffers
+        
+        Returns:
+            Tuple of (io_binding, input buffer (1, 1, 48, 48), output buffer (1, num_classes))
+        """
+        bound = getattr(self._staging, 'ort', None)
+        if bound is None:
+            x = np.zeros((1, 1, 48, 48), dtype=np.float32)
+            y = np.zeros((1, len(config.EMOTION_LABELS)), dtype=np.float32)
+            binding = self.session.io_binding()
+            binding.bind_ortvalue_input('x', ort.OrtValue.ortvalue_from_numpy(x))
+            binding.bind_ortvalue_output('y', ort.OrtValue.ortvalue_from_numpy(y))
+            bound = self._staging.ort = (binding, x, y)
+        
+        return bound
+    
+    def _to_device(self, x):
+        """
+        Convert a float32 input array to a tensor on the model device
+        On CPU this wraps the array without copying. On CUDA the data goes through this
+        thread's pinned staging buffer, so the H2D copy is asynchronous and no per-frame
+        device allocation happens; buffers grow to the largest batch seen
+        
+        Args:
+            x: Float32 numpy array of shape (batch, 1, 48, 48)
             
-            # Get prediction
-            probs_np = probabilities.cpu().numpy()[0]
-            predicted_idx = np.argmax(probs_np)
-            predicted_emotion = config.EMOTION_LABELS[predicted_idx]
-            confidence = float(probs_np[predicted_idx])
+        Returns:
+            Input tensor in the model's input dtype
+        """
+        x = torch.from_numpy(x)
+        if self.device.type != 'cuda':
+            return x.to(self._input_dtype)
+        
+        n = x.shape[0]
+        buffers = getattr(self._staging, 'buffers', None)
+        if buffers is None or buffers[0].shape[0] < n:
+            buffers = (
+                torch.empty(x.shape, dtype=torch.float32, pin_memory=True),
+                torch.empty(x.shape, dtype=self._input_dtype, device=self.device)
+            )
+            self._staging.buffers = buffers
+        
+        # The previous call synchronized on its output, so the pinned buffer is free to reuse
+        pinned, device_in = buffers[0][:n], buffers[1][:n]
+        pinned.copy_(x)
+        device_in.copy_(pinned, non_blocking=True)
+        return device_in
+    
+    def _forward(self, x, model=None):
+        """
+        Run the PyTorch model, under autocast if configured
+        
+        Args:
+            x: Input tensor of shape (batch, 1, 48, 48)
+            model: Module to run (defaults to the inference module)
             
-            # Convert probabilities to dictionary
-            prob_dict = {
-                emotion: float(prob)
-                for emotion, prob in zip(config.EMOTION_LABELS, probs_np)
-            }
+        Returns:
+            FP32 logits (batch, num_classes)
+        """
+        model = self._torch_model if model is None else model
+        if self._autocast_dtype is None:
+            return model(x).float()
+        
+        with torch.autocast(device_type=self.device.type, dtype=self._autocast_dtype):
+            return model(x).float()
+    
+    def _format_prediction(self, logits, return_probs=True):
+        """
+        Convert a logit vector into a prediction tuple
+        Softmax is monotonic, so the argmax is taken on the logits directly
+        
+        Args:
+            logits: Numpy array of num_classes logits
+            return_probs: Whether to compute the probability array
             
-            return predicted_emotion, prob_dict, confidence
+        Returns:
+            Tuple of (predicted_emotion, probabilities, confidence); probabilities is a
+            float32 array ordered as config.EMOTION_LABELS
+        """
+        predicted_idx = int(np.argmax(logits))
+        predicted_emotion = config.EMOTION_LABELS[predicted_idx]
+        
+        # Numerically stable softmax, shifted by the winning logit
+        exp = np.exp(logits - logits[predicted_idx])
+        total = exp.sum()
+        confidence = float(1.0 / total)
+        
+        if not return_probs:
+            return predicted_emotion, None, confidence
+        
+        # Probabilities stay a float32 array; clients get a list/dict built at emit time
+        return predicted_emotion, exp / total, confidence
     
-    def predict_batch(self, face_images):
+    def predict_batch(self, face_images, return_probs=True):
         """
-        Predict emotions for a batch of face images
+        Predict emotions for a batch of face images in a single forward pass
         
         Args:
-            face_images: List of grayscale face images
+            face_images: List of grayscale face images (48x48, normalized [0,1])
+            return_probs: Whether to compute the probability arrays
             
         Returns:
-            List of predictions
+            List of (predicted_emotion, probabilities, confidence) tuples
         """
-        predictions = []
-        for img in face_images:
-            pred = self.predict(img)
-            predictions.append(pred)
-        return predictions
+        if not face_images:
+            return []
+        
+        # A lone frame takes the single-sample path and its reusable buffers
+        if len(face_images) == 1:
+            return [self.predict(face_images[0], return_probs)]
+        
+        # Stack into one (N, 1, 48, 48) array
+        x = np.stack(face_images).astype(np.float32, copy=False)[:, None]
+        
+        if self.session is not None:
+            logits = self.session.run(None, {'x': x})[0]
+        else:
+            with torch.inference_mode():
+                x = self._to_device(x)
+                logits = self._forward(x).cpu().numpy()
+        
+        return [self._format_prediction(row, return_probs) for row in logits]
@@ -14,9 +14,11 @@ class FaceDetector:
     def __init__(self):
         """Initialize MediaPipe Face Mesh"""
         self.mp_face_mesh = mp.solutions.face_mesh
+        # Iris refinement is off: no feature uses the refined iris points.
+        # Re-enable it if an iris-based feature is added
         self.face_mesh = self.mp_face_mesh.FaceMesh(
             max_num_faces=1,
-            refine_landmarks=True,
+            refine_landmarks=False,
             min_detection_confidence=config.FACE_DETECTION_CONFIDENCE,
             min_tracking_confidence=config.FACE_DETECTION_CONFIDENCE
         )
@@ -39,42 +41,66 @@ class FaceDetector:
                                    361, 288, 397, 365, 379, 378, 400, 377, 152, 148,
                                    176, 149, 150, 136, 172, 58, 132, 93, 234, 127,
                                    162, 21, 54, 103, 67, 109]
+        self._oval_idx = np.array(self.FACE_OVAL_INDICES, dtype=np.int32)
         
-    def detect_face_and_landmarks(self, frame):
+        # Reusable RGB conversion buffer (reallocated only when the frame shape changes)
+        self._rgb_buf = None
+        
+        # Per-stream [frames since detection, landmarks] for running Face Mesh every Kth frame
+        self.detect_every_k = max(1, config.FACE_DETECT_EVERY_K)
+        self._tracking = {}
+        
+        # Reusable 48x48 resize and grayscale buffers for extract_face_roi (the video pipeline
+        # runs one frame at a time through this stage); only the normalized ROI is allocated
+        self._roi_bgr = np.empty((48, 48, 3), dtype=np.uint8)
+        self._roi_gray = np.empty((48, 48), dtype=np.uint8)
+        
+        # Warm up the graph so its first-run initialization doesn't land on the first real frame
+        scale = config.VIDEO_DECODE_DOWNSCALE
+        blank = np.zeros(
+            (config.VIDEO_FRAME_HEIGHT // scale, config.VIDEO_FRAME_WIDTH // scale, 3), dtype=np.uint8
+        )
+        self.face_mesh.process(blank)
+        self.face_mesh.process(blank)
+        
+    def detect_face_and_landmarks(self, frame, return_annotated=False):
         """
         Detect face and extract facial landmarks
         
         Args:
             frame: Input image (BGR format from OpenCV)
+            return_annotated: Draw the face mesh on a copy of the frame (visualization only)
             
         Returns:
             Tuple of (success, landmarks, annotated_frame)
             - success: Boolean indicating if face was detected
-            - landmarks: List of 468 (x, y, z) landmark coordinates (normalized)
-            - annotated_frame: Frame with face mesh drawn (for visualization)
+            - landmarks: (N, 3) float32 array of (x, y, z) landmark coordinates
+              (x, y normalized to [0, 1], z relative depth)
+            - annotated_frame: Frame with face mesh drawn if return_annotated,
+              otherwise the input frame
         """
-        # Convert BGR to RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        # Convert BGR to RGB into the reusable buffer
+        if self._rgb_buf is None or self._rgb_buf.shape != frame.shape:
+            self._rgb_buf = np.empty_like(frame)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
         
         # Process the frame
-        results = self.face_mesh.process(rgb_frame)
+        results = self.face_mesh.process(self._rgb_buf)
         
         if results.multi_face_landmarks:
             # Get the first face landmarks
             face_landmarks = results.multi_face_landmarks[0]
             
-            # Extract landmark coordinates
-            landmarks = []
-            h, w, _ = frame.shape
+            # Extract landmark coordinates into one array, once per frame;
+            # filling column by column avoids building a tuple per landmark
+            points = face_landmarks.landmark
+            landmarks = np.empty((len(points), 3), dtype=np.float32)
+            landmarks[:, 0] = [lm.x for lm in points]  # Normalized [0, 1]
+            landmarks[:, 1] = [lm.y for lm in points]  # Normalized [0, 1]
+            landmarks[:, 2] = [lm.z for lm in points]  # Relative depth
             
-            for landmark in face_landmarks.landmark:
-                landmarks.append({
-                    'x': landmark.x,  # Normalized [0, 1]
-                    'y': landmark.y,  # Normalized [0, 1]
-                    'z': landmark.z,  # Relative depth
-                    'x_px': int(landmark.x * w),  # Pixel coordinates
-                    'y_px': int(landmark.y * h)
-                })
+            if not return_annotated:
+                return True, landmarks, frame
             
             # Create annotated frame for visualization
             annotated_frame = frame.copy()
@@ -90,13 +116,51 @@ class FaceDetector:
         else:
             return False, None, frame
     
+    def track_face_landmarks(self, frame, stream_id):
+        """
+        Get face landmarks for a frame of a stream, running Face Mesh on every Kth frame
+        and reusing the stream's last landmarks in between
+        
+        Args:
+            frame: Input image (BGR format from OpenCV)
+            stream_id: Stream (session) key; one detector serves every connected session
+            
+        Returns:
+            Tuple of (landmarks, tracked)
+            - landmarks: (N, 3) float32 array, or None if no face was detected
+            - tracked: True if the landmarks were reused rather than detected on this frame
+        """
+        tracked = self._tracking.get(stream_id)
+        if tracked is not None:
+            tracked[0] += 1
+            if tracked[0] % self.detect_every_k != 0:
+                return tracked[1], True
+        
+        face_detected, landmarks, _ = self.detect_face_and_landmarks(frame)
+        if not face_detected:
+            # Drop the stream's landmarks so the next frame runs detection again
+            self._tracking.pop(stream_id, None)
+            return None, False
+        
+        self._tracking[stream_id] = [0, landmarks]
+        return landmarks, False
+    
+    def reset_tracking(self, stream_id):
+        """
+        Discard a stream's reused landmarks so its next frame runs detection
+        
+        Args:
+            stream_id: Stream (session) to reset
+        """
+        self._tracking.pop(stream_id, None)
+    
     def extract_face_roi(self, frame, landmarks):
         """
         Extract face region of interest (ROI) for emotion model
         
         Args:
             frame: Input image
-            landmarks: Facial landmarks
+            landmarks: (N, 3) array of normalized facial landmarks
             
         Returns:
             Face ROI image (grayscale, 48x48 for FER models)
@@ -104,12 +168,14 @@ class FaceDetector:
         if landmarks is None or len(landmarks) == 0:
             return None
         
-        # Get bounding box from landmarks
-        x_coords = [lm['x_px'] for lm in landmarks]
-        y_coords = [lm['y_px'] for lm in landmarks]
+        # Get pixel bounding box from the face oval, which encloses every other landmark
+        h, w = frame.shape[:2]
+        oval = landmarks[self._oval_idx, :2]
+        x_min, y_min = oval.min(axis=0)
+        x_max, y_max = oval.max(axis=0)
         
-        x_min, x_max = min(x_coords), max(x_coords)
-        y_min, y_max = min(y_coords), max(y_coords)
+        x_min, x_max = int(x_min * w), int(x_max * w)
+        y_min, y_max = int(y_min * h), int(y_max * h)
         
         # Add padding (10%)
         padding_x = int((x_max - x_min) * 0.1)
@@ -126,17 +192,22 @@ class FaceDetector:
         if face_roi.size == 0:
             return None
         
-        # Convert to grayscale
-        if len(face_roi.shape) == 3:
-            face_gray = cv2.cvtColor(face_roi, cv2.COLOR_BGR2GRAY)
+        # Resize to 48x48 (standard for FER models) before converting,
+        # so the grayscale conversion only touches the small image
+        if face_roi.ndim == 3 and face_roi.dtype == np.uint8:
+            # Resize and convert into the reusable buffers
+            cv2.resize(face_roi, (48, 48), dst=self._roi_bgr)
+            face_gray = cv2.cvtColor(self._roi_bgr, cv2.COLOR_BGR2GRAY, dst=self._roi_gray)
         else:
-            face_gray = face_roi
-        
-        # Resize to 48x48 (standard for FER models)
-        face_resized = cv2.resize(face_gray, (48, 48))
+            face_resized = cv2.resize(face_roi, (48, 48))
+            if len(face_resized.shape) == 3:
+                face_gray = cv2.cvtColor(face_resized, cv2.COLOR_BGR2GRAY)
+            else:
+                face_gray = face_resized
         
-        # Normalize to [0, 1]
-        face_normalized = face_resized.astype(np.float32) / 255.0
+        # Normalize to [0, 1] in a single float32 pass; this array is handed to the batcher
+        # and cache, so it is the one allocation per frame
+        face_normalized = np.multiply(face_gray, np.float32(1.0 / 255.0), dtype=np.float32)
         
         return face_normalized
     
@@ -145,13 +216,14 @@ class FaceDetector:
         Get subset of landmarks by indices
         
         Args:
-            landmarks: All facial landmarks
+            landmarks: (N, 3) array of facial landmarks
             indices: List of landmark indices to extract
             
         Returns:
-            List of selected landmarks
+            Array of selected landmarks
         """
-        return [landmarks[i] for i in indices if i < len(landmarks)]
+        indices = np.asarray(indices)
+        return landmarks[indices[indices < len(landmarks)]]
     
     def close(self):
         """Release resources"""
@@ -11,48 +11,63 @@ class VideoFeatureExtractor:
     
     def __init__(self):
         # Eye landmark indices
-        self.LEFT_EYE = [33, 160, 158, 133, 153, 144]
-        self.RIGHT_EYE = [362, 385, 387, 263, 373, 380]
+        self.LEFT_EYE = np.array([33, 160, 158, 133, 153, 144], dtype=np.int32)
+        self.RIGHT_EYE = np.array([362, 385, 387, 263, 373, 380], dtype=np.int32)
         
         # Eyebrow landmark indices
-        self.LEFT_EYEBROW = [70, 63, 105, 66, 107]
-        self.RIGHT_EYEBROW = [300, 293, 334, 296, 336]
+        self.LEFT_EYEBROW = np.array([70, 63, 105, 66, 107], dtype=np.int32)
+        self.RIGHT_EYEBROW = np.array([300, 293, 334, 296, 336], dtype=np.int32)
         
         # Mouth landmark indices
-        self.MOUTH_OUTER = [61, 185, 40, 39, 37, 0, 267, 269, 270, 409, 291]
-        self.MOUTH_INNER = [78, 95, 88, 178, 87, 14, 317, 402, 318, 324, 308]
+        self.MOUTH_OUTER = np.array([61, 185, 40, 39, 37, 0, 267, 269, 270, 409, 291], dtype=np.int32)
+        self.MOUTH_INNER = np.array([78, 95, 88, 178, 87, 14, 317, 402, 318, 324, 308], dtype=np.int32)
         
         # Nose tip for reference
         self.NOSE_TIP = 1
         
         # Face points for head pose
-        self.FACE_OVAL = [10, 338, 297, 332, 284, 251]
+        self.FACE_OVAL = np.array([10, 338, 297, 332, 284, 251], dtype=np.int32)
+        
+        # Both eyes / eyebrows stacked as (2, k) so left and right are gathered together
+        self.EYES = np.stack([self.LEFT_EYE, self.RIGHT_EYE])
+        self.EYEBROWS = np.stack([self.LEFT_EYEBROW, self.RIGHT_EYEBROW])
+        
+        # EAR point pairs within an eye: two vertical pairs, then the horizontal pair
+        self._EAR_FROM = np.array([1, 2, 0], dtype=np.int32)
+        self._EAR_TO = np.array([5, 4, 3], dtype=np.int32)
+        
+        # Mouth point pairs: upper/lower lip center, left/right corner
+        self._MOUTH_FROM = np.array([13, 61], dtype=np.int32)
+        self._MOUTH_TO = np.array([14, 291], dtype=np.int32)
         
     def extract_features(self, landmarks):
         """
         Extract all geometric features from facial landmarks
         
         Args:
-            landmarks: List of facial landmark coordinates
+            landmarks: (N, 3) array of facial landmark coordinates
             
         Returns:
             Dictionary of extracted features
         """
+        # All geometric features are 2-D, so work on the (x, y) columns
+        landmarks = np.asarray(landmarks)[:, :2]
         features = {}
         
-        # Extract eye features
-        features['left_eye_openness'] = self._calculate_eye_aspect_ratio(landmarks, self.LEFT_EYE)
-        features['right_eye_openness'] = self._calculate_eye_aspect_ratio(landmarks, self.RIGHT_EYE)
+        # Extract eye features (left and right in one gather)
+        left_ear, right_ear = self._calculate_eye_aspect_ratio(landmarks, self.EYES)
+        features['left_eye_openness'] = float(left_ear)
+        features['right_eye_openness'] = float(right_ear)
         features['avg_eye_openness'] = (features['left_eye_openness'] + features['right_eye_openness']) / 2
         
         # Extract eyebrow features
-        features['left_eyebrow_height'] = self._calculate_eyebrow_height(landmarks, self.LEFT_EYEBROW, self.LEFT_EYE)
-        features['right_eyebrow_height'] = self._calculate_eyebrow_height(landmarks, self.RIGHT_EYEBROW, self.RIGHT_EYE)
+        left_brow, right_brow = self._calculate_eyebrow_height(landmarks, self.EYEBROWS, self.EYES)
+        features['left_eyebrow_height'] = float(left_brow)
+        features['right_eyebrow_height'] = float(right_brow)
         features['avg_eyebrow_height'] = (features['left_eyebrow_height'] + features['right_eyebrow_height']) / 2
         
         # Extract mouth features
-        features['mouth_openness'] = self._calculate_mouth_aspect_ratio(landmarks)
-        features['mouth_width'] = self._calculate_mouth_width(landmarks)
+        features['mouth_openness'], features['mouth_width'] = self._calculate_mouth_metrics(landmarks)
         
         # Extract head pose features
         pitch, yaw, roll = self._estimate_head_pose(landmarks)
@@ -60,8 +75,8 @@ class VideoFeatureExtractor:
         features['head_yaw'] = yaw
         features['head_roll'] = roll
         
-        # Extract facial symmetry
-        features['facial_symmetry'] = self._calculate_facial_symmetry(landmarks)
+        # Extract facial symmetry from the eye/eyebrow features above
+        features['facial_symmetry'] = self._calculate_facial_symmetry(features)
         
         # Additional stress indicators
         features['eye_strain'] = self._calculate_eye_strain(features)
@@ -75,108 +90,60 @@ class VideoFeatureExtractor:
         Higher value = more open eye
         
         Args:
-            landmarks: Facial landmarks
-            eye_indices: Indices for eye landmarks
+            landmarks: (N, 2) array of facial landmarks
+            eye_indices: Indices for eye landmarks, (6,) for one eye or (k, 6) for several
             
         Returns:
-            Eye aspect ratio
+            Eye aspect ratio (scalar or one value per eye)
         """
-        try:
-            eye_points = [landmarks[i] for i in eye_indices]
-            
-            # Vertical eye landmarks (top and bottom)
-            vertical_1 = self._euclidean_distance(eye_points[1], eye_points[5])
-            vertical_2 = self._euclidean_distance(eye_points[2], eye_points[4])
-            
-            # Horizontal eye landmark
-            horizontal = self._euclidean_distance(eye_points[0], eye_points[3])
-            
-            # EAR formula
-            ear = (vertical_1 + vertical_2) / (2.0 * horizontal + 1e-6)
-            
-            return float(ear)
-        except Exception as e:
-            print(f"Eye aspect ratio calculation error: {e}")
-            return 0.2  # Default value
+        eye_points = landmarks[eye_indices]
+        
+        # Vertical (top-bottom) and horizontal eye distances in one norm call
+        distances = np.linalg.norm(
+            eye_points[..., self._EAR_FROM, :] - eye_points[..., self._EAR_TO, :], axis=-1
+        )
+        
+        # EAR formula
+        return (distances[..., 0] + distances[..., 1]) / (2.0 * distances[..., 2] + 1e-6)
     
     def _calculate_eyebrow_height(self, landmarks, eyebrow_indices, eye_indices):
         """
         Calculate distance between eyebrow and eye (indicator of surprise/fear)
         
         Args:
-            landmarks: Facial landmarks
-            eyebrow_indices: Eyebrow landmark indices
-            eye_indices: Eye landmark indices
+            landmarks: (N, 2) array of facial landmarks
+            eyebrow_indices: Eyebrow landmark indices, (5,) or (k, 5)
+            eye_indices: Eye landmark indices, (6,) or (k, 6)
             
         Returns:
-            Normalized eyebrow height
-        """
-        try:
-            # Get centroid of eyebrow
-            eyebrow_points = [landmarks[i] for i in eyebrow_indices]
-            eyebrow_y = np.mean([p['y'] for p in eyebrow_points])
-            
-            # Get top of eye
-            eye_points = [landmarks[i] for i in eye_indices]
-            eye_y = np.mean([p['y'] for p in eye_points])
-            
-            # Distance (normalized)
-            height = abs(eyebrow_y - eye_y)
-            
-            return float(height)
-        except Exception as e:
-            print(f"Eyebrow height calculation error: {e}")
-            return 0.05  # Default value
-    
-    def _calculate_mouth_aspect_ratio(self, landmarks):
+            Normalized eyebrow height (scalar or one value per side)
         """
-        Calculate Mouth Aspect Ratio (MAR)
-        Higher value = more open mouth
+        # Centroid of eyebrow vs. centroid of eye
+        eyebrow_y = landmarks[eyebrow_indices, 1].mean(axis=-1)
+        eye_y = landmarks[eye_indices, 1].mean(axis=-1)
         
-        Args:
-            landmarks: Facial landmarks
-            
-        Returns:
-            Mouth aspect ratio
-        """
-        try:
-            # Vertical mouth opening (top to bottom)
-            top_lip = landmarks[13]  # Upper lip center
-            bottom_lip = landmarks[14]  # Lower lip center
-            vertical = self._euclidean_distance(top_lip, bottom_lip)
-            
-            # Horizontal mouth width
-            left_corner = landmarks[61]
-            right_corner = landmarks[291]
-            horizontal = self._euclidean_distance(left_corner, right_corner)
-            
-            # MAR formula
-            mar = vertical / (horizontal + 1e-6)
-            
-            return float(mar)
-        except Exception as e:
-            print(f"Mouth aspect ratio calculation error: {e}")
-            return 0.1  # Default value
+        return np.abs(eyebrow_y - eye_y)
     
-    def _calculate_mouth_width(self, landmarks):
+    def _calculate_mouth_metrics(self, landmarks):
         """
-        Calculate mouth width (indicator of smile/frown)
+        Calculate Mouth Aspect Ratio (MAR) and mouth width
+        Higher MAR = more open mouth; width indicates smile/frown
         
         Args:
-            landmarks: Facial landmarks
+            landmarks: (N, 2) array of facial landmarks
             
         Returns:
-            Normalized mouth width
+            Tuple of (mouth aspect ratio, normalized mouth width)
         """
-        try:
-            left_corner = landmarks[61]
-            right_corner = landmarks[291]
-            width = self._euclidean_distance(left_corner, right_corner)
-            
-            return float(width)
-        except Exception as e:
-            print(f"Mouth width calculation error: {e}")
-            return 0.2  # Default value
+        # Vertical mouth opening (upper to lower lip center) and
+        # horizontal mouth width (left to right corner)
+        dx, dy = (landmarks[self._MOUTH_FROM] - landmarks[self._MOUTH_TO]).T
+        vertical, horizontal = np.hypot(dx, dy)
+        
+        # MAR formula
+        mar = vertical / (horizontal + 1e-6)
+        
+        return float(mar), float(horizontal)
     
     def _estimate_head_pose(self, landmarks):
         """
@@ -184,68 +151,53 @@ class VideoFeatureExtractor:
         Simplified 2D approach
         
         Args:
-            landmarks: Facial landmarks
+            landmarks: (N, 2) array of facial landmarks
             
         Returns:
             Tuple of (pitch, yaw, roll) in degrees
         """
-        try:
-            # Use key points for pose estimation
-            nose_tip = landmarks[1]
-            left_eye_outer = landmarks[33]
-            right_eye_outer = landmarks[263]
-            mouth_center = landmarks[13]
-            
-            # Calculate yaw (left-right rotation)
-            left_dist = abs(nose_tip['x'] - left_eye_outer['x'])
-            right_dist = abs(nose_tip['x'] - right_eye_outer['x'])
-            yaw = (right_dist - left_dist) * 100  # Approximate in degrees
-            
-            # Calculate pitch (up-down rotation)
-            eye_y = (left_eye_outer['y'] + right_eye_outer['y']) / 2
-            mouth_y = mouth_center['y']
-            pitch = (mouth_y - eye_y) * 100  # Approximate in degrees
-            
-            # Calculate roll (tilt)
-            roll = np.arctan2(
-                right_eye_outer['y'] - left_eye_outer['y'],
-                right_eye_outer['x'] - left_eye_outer['x']
-            ) * 180 / np.pi
-            
-            return float(pitch), float(yaw), float(roll)
-        except Exception as e:
-            print(f"Head pose estimation error: {e}")
-            return 0.0, 0.0, 0.0
+        # Use key points for pose estimation
+        nose_tip = landmarks[1]
+        left_eye_outer = landmarks[33]
+        right_eye_outer = landmarks[263]
+        mouth_center = landmarks[13]
+        
+        # Calculate yaw (left-right rotation)
+        left_dist = abs(nose_tip[0] - left_eye_outer[0])
+        right_dist = abs(nose_tip[0] - right_eye_outer[0])
+        yaw = (right_dist - left_dist) * 100  # Approximate in degrees
+        
+        # Calculate pitch (up-down rotation)
+        eye_y = (left_eye_outer[1] + right_eye_outer[1]) / 2
+        mouth_y = mouth_center[1]
+        pitch = (mouth_y - eye_y) * 100  # Approximate in degrees
+        
+        # Calculate roll (tilt)
+        dx, dy = right_eye_outer - left_eye_outer
+        roll = np.arctan2(dy, dx) * 180 / np.pi
+        
+        return float(pitch), float(yaw), float(roll)
     
-    def _calculate_facial_symmetry(self, landmarks):
+    def _calculate_facial_symmetry(self, features):
         """
         Calculate facial symmetry (deviation from symmetry can indicate stress)
         
         Args:
-            landmarks: Facial landmarks
+            features: Features dictionary with eye openness and eyebrow heights filled in
             
         Returns:
             Symmetry score (1.0 = perfect symmetry, 0.0 = asymmetric)
         """
-        try:
-            # Compare left and right eye openness
-            left_ear = self._calculate_eye_aspect_ratio(landmarks, self.LEFT_EYE)
-            right_ear = self._calculate_eye_aspect_ratio(landmarks, self.RIGHT_EYE)
-            eye_symmetry = 1.0 - abs(left_ear - right_ear)
-            
-            # Compare left and right eyebrow height
-            left_brow = self._calculate_eyebrow_height(landmarks, self.LEFT_EYEBROW, self.LEFT_EYE)
-            right_brow = self._calculate_eyebrow_height(landmarks, self.RIGHT_EYEBROW, self.RIGHT_EYE)
-            brow_symmetry = 1.0 - abs(left_brow - right_brow) * 10
-            
-            # Average symmetry
-            symmetry = (eye_symmetry + brow_symmetry) / 2
-            symmetry = np.clip(symmetry, 0.0, 1.0)
-            
-            return float(symmetry)
-        except Exception as e:
-            print(f"Facial symmetry calculation error: {e}")
-            return 0.8  # Default value
+        # Compare left and right eye openness
+        eye_symmetry = 1.0 - abs(features['left_eye_openness'] - features['right_eye_openness'])
+        
+        # Compare left and right eyebrow height
+        brow_symmetry = 1.0 - abs(features['left_eyebrow_height'] - features['right_eyebrow_height']) * 10
+        
+        # Average symmetry
+        symmetry = (eye_symmetry + brow_symmetry) / 2
+        
+        return min(max(symmetry, 0.0), 1.0)
     
     def _calculate_eye_strain(self, features):
         """
@@ -297,12 +249,6 @@ class VideoFeatureExtractor:
         
         return float(tension)
     
-    def _euclidean_distance(self, point1, point2):
-        """Calculate Euclidean distance between two points"""
-        dx = point1['x'] - point2['x']
-        dy = point1['y'] - point2['y']
-        return np.sqrt(dx**2 + dy**2)
-    
     def get_feature_vector_for_model(self, features):
         """
         Convert feature dictionary to vector for additional models (optional)
@@ -0,0 +1,87 @@
+"""
+Video Score Kernels
+Numba-compiled per-frame stress scoring kernel for the video stress scorer
+"""
+import numpy as np
+from numba import njit
+
+
+# Layout of the packed feature vector (matches VideoFeatureExtractor.get_feature_vector_for_model)
+FEATURE_KEYS = (
+    'avg_eye_openness', 'avg_eyebrow_height', 'mouth_openness', 'mouth_width',
+    'head_pitch', 'head_yaw', 'head_roll', 'facial_symmetry', 'eye_strain', 'facial_tension'
+)
+
+# Scorer defaults for features missing from a feature dictionary
+FEATURE_DEFAULTS = (0.2, 0.05, 0.0, 0.0, 0.0, 0.0, 0.0, 0.8, 0.0, 0.0)
+
+
+@njit(cache=True)
+def score_core(feat, has_features, probs, weights, primary_stress, confidence, low_thr, high_thr):
+    """
+    Combine emotion and facial-feature stress into one confidence-adjusted score
+
+    Args:
+        feat: Packed 10-element feature vector (see FEATURE_KEYS)
+        has_features: Whether feat holds real features (otherwise feature stress is 0.5)
+        probs: Emotion probabilities in label order
+        weights: Per-emotion stress weights in label order
+        primary_stress: Stress weight of the predicted emotion
+        confidence: Model confidence score
+        low_thr: Low/Medium stress threshold
+        high_thr: Medium/High stress threshold
+
+    Returns:
+        Tuple of (stress_score, level_idx, weighted_stress, feature_stress),
+        level_idx is 0 (Low), 1 (Medium) or 2 (High)
+    """
+    # Weighted average of all emotion probabilities
+    weighted_stress = 0.0
+    for i in range(probs.shape[0]):
+        weighted_stress += probs[i] * weights[i]
+
+    feature_stress = 0.5
+    if has_features:
+        # Low eye openness (fatigue/stress)
+        eye_openness = feat[0]
+        if eye_openness < 0.15:
+            openness_stress = 0.7
+        elif eye_openness < 0.2:
+            openness_stress = 0.4
+        else:
+            openness_stress = 0.1
+
+        # High eyebrow position, facial asymmetry and extreme head poses
+        eyebrow_stress = min(feat[1] * 10.0, 1.0)
+        asymmetry_stress = 1.0 - feat[7]
+        pose_stress = 0.6 if abs(feat[4]) > 20 or abs(feat[5]) > 20 else 0.2
+
+        # Average all six indicators (eye strain and tension are used as-is)
+        feature_stress = (
+            feat[8] + feat[9] + openness_stress +
+            eyebrow_stress + asymmetry_stress + pose_stress
+        ) / 6
+        feature_stress = min(max(feature_stress, 0.0), 1.0)
+
+    # 30% primary emotion, 40% weighted emotions, 30% facial features
+    combined = 0.3 * primary_stress + 0.4 * weighted_stress + 0.3 * feature_stress
+
+    # Low confidence -> move towards neutral 0.5, then clip to [0, 1]
+    score = combined * confidence + 0.5 * (1 - confidence)
+    score = min(max(score, 0.0), 1.0)
+
+    if score < low_thr:
+        level_idx = 0
+    elif score < high_thr:
+        level_idx = 1
+    else:
+        level_idx = 2
+
+    return score, level_idx, weighted_stress, feature_stress
+
+
+# Compile at import so the JIT cost isn't paid on the first frame
+score_core(
+    np.zeros(len(FEATURE_KEYS)), True, np.zeros(7, dtype=np.float32),
+    np.zeros(7, dtype=np.float32), 0.5, 1.0, 0.3, 0.7
+)
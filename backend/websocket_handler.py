@@ -2,18 +2,64 @@
 WebSocket Handler
 Manages real-time communication between frontend and backend
 """
-import base64
+import logging
 import numpy as np
 import cv2
+import eventlet
+from eventlet import tpool
+from eventlet.semaphore import Semaphore
+from flask import copy_current_request_context
 from flask_socketio import emit
 
+try:
+    from pybase64 import b64decode  # SIMD-accelerated drop-in for base64.b64decode (base64 payloads)
+except ImportError:
+    from base64 import b64decode
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+except ImportError:
+    TurboJPEG = None
+
+# cv2.imdecode flags that decode at a reduced size, by VIDEO_DECODE_DOWNSCALE
+_IMREAD_SCALED = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8
+}
+
 # Import processing components
 from audio_stream import AudioPreprocessor, AudioFeatureExtractor, AudioEmotionModel, AudioStressScorer
 from video_stream import FaceDetector, VideoFeatureExtractor, VideoEmotionModel, VideoStressScorer
 from fusion_engine import MultimodalFusion, StressClassifier
-from utils import AlertManager, SessionManager
+from utils import AlertManager, SessionManager, InferenceBatcher, PredictionCache, audio_cache_key, face_cache_key
 import config
 
+log = logging.getLogger(__name__)
+
+
+def _payload_bytes(payload):
+    """Raw bytes of a media payload: binary MessagePack fields pass through, base64 strings are decoded"""
+    if isinstance(payload, str):
+        return b64decode(payload)
+    return payload
+
+
+def _payload_size(payload):
+    """Decoded size in bytes of a media payload (base64 carries 3 bytes per 4 characters)"""
+    if isinstance(payload, str):
+        return len(payload) * 3 // 4
+    return len(payload)
+
+
+def _probs_payload(probs, as_array=False):
+    """Emotion probability array as sent to clients: a list in EMOTION_LABELS order, or a {label: probability} dict"""
+    values = probs.tolist()
+    if as_array:
+        return values
+    return dict(zip(config.EMOTION_LABELS, values))
+
 
 class WebSocketHandler:
     """Handles WebSocket events for real-time processing"""
@@ -31,146 +77,480 @@ class WebSocketHandler:
         self.video_emotion_model = VideoEmotionModel(config.VIDEO_MODEL_PATH)
         self.video_stress_scorer = VideoStressScorer()
         
+        # libjpeg-turbo frame decoder (falls back to cv2.imdecode)
+        self.decode_downscale = config.VIDEO_DECODE_DOWNSCALE
+        self._imread_flag = _IMREAD_SCALED[self.decode_downscale]
+        self._turbojpeg = None
+        if TurboJPEG is not None:
+            try:
+                self._turbojpeg = TurboJPEG()
+            except Exception as e:
+                log.warning("libturbojpeg not available, decoding frames with OpenCV: %s", e)
+        
         # Initialize fusion and utilities
         self.fusion_engine = MultimodalFusion()
         self.stress_classifier = StressClassifier()
         self.alert_manager = AlertManager()
         self.session_manager = SessionManager()
         
+        # Socket.IO SID -> session_id, and SID -> session record (skips the id lookup per event)
+        self.sid_to_session = {}
+        self._sessions_by_sid = {}
+        
+        # Coalesce audio predictions from concurrent sessions into batched forward passes
+        self.audio_batcher = InferenceBatcher(
+            self._predict_audio_batch,
+            window=config.AUDIO_BATCH_WINDOW,
+            max_batch_size=config.AUDIO_BATCH_MAX_SIZE
+        )
+        
+        # Same for video face crops
+        self.video_batcher = InferenceBatcher(
+            self._predict_video_batch,
+            window=config.VIDEO_BATCH_WINDOW,
+            max_batch_size=config.VIDEO_BATCH_MAX_SIZE
+        )
+        
+        # Near-identical inputs (silence edges, a still face) reuse earlier predictions;
+        # session_id -> {'audio': PredictionCache, 'video': PredictionCache}, so one client's
+        # entries are never served to another
+        self._prediction_caches = {}
+        
+        # Counters of caches dropped on disconnect, kept for get_cache_stats
+        self._retired_cache_stats = {
+            'audio': {'hits': 0, 'misses': 0},
+            'video': {'hits': 0, 'misses': 0}
+        }
+        
+        # Per-session frame counter and last video result; only every Kth frame is analyzed
+        self.video_every_k = max(1, config.VIDEO_PROCESS_EVERY_K)
+        self._video_frame_count = {}
+        self._last_video_result = {}
+        
+        # Per-session last audio result; video frames sent with fuse=True are fused with it,
+        # so the stress update rate follows the video stream rather than the audio chunks
+        self._last_audio_result = {}
+        
+        # Per-session landmarks and emotion prediction of the last frame that ran the CNN;
+        # frames whose landmarks stay within LANDMARK_REUSE_EPS of them reuse the prediction
+        self.landmark_reuse_eps = config.LANDMARK_REUSE_EPS
+        self._prediction_anchor = {}
+        
+        # Video frames run as a pipeline: Face Mesh/ROI and the emotion CNN each execute on a
+        # native thread, so one frame's CNN overlaps the next frame's Face Mesh. The Face Mesh
+        # graph and its buffers are shared, so that stage takes one frame at a time
+        self._face_stage = Semaphore(1)
+        
+        # Sessions with an audio chunk / video frame still being processed; a new one arriving
+        # meanwhile is dropped instead of queueing behind it
+        self._audio_inflight = set()
+        self._video_inflight = set()
+        
+        if config.PIPELINE_WARMUP:
+            self._warm_up()
+        
+    def _warm_up(self):
+        """
+        Run synthetic inputs through both pipelines once so librosa/noisereduce setup and
+        model kernel selection happen at startup instead of on the first client's data
+        (predictions bypass the caches, so nothing synthetic is served later)
+        """
+        try:
+            # A noise chunk is loud enough to pass the silence check and run every stage
+            rng = np.random.default_rng(0)
+            chunk = (0.1 * rng.standard_normal(int(config.AUDIO_SAMPLE_RATE * config.AUDIO_CHUNK_DURATION))).astype(np.float32)
+            feature_vector = self._extract_audio_features(chunk, '__warmup__')
+            self.audio_preprocessor.reset_noise_profile('__warmup__')
+            if feature_vector is not None:
+                self.audio_emotion_model.predict(feature_vector)
+                self.audio_emotion_model.predict_batch([feature_vector, feature_vector])
+            
+            face_roi = np.zeros((48, 48), dtype=np.float32)
+            self.video_emotion_model.predict(face_roi)
+            self.video_emotion_model.predict_batch([face_roi, face_roi])
+        except Exception as e:
+            log.warning("Pipeline warm-up failed, first requests may be slower: %s", e)
+    
+    def _predict_audio_batch(self, feature_vectors):
+        """
+        Run batched audio inference on a native thread
+        PyTorch releases the GIL, so the event loop keeps serving other sockets meanwhile
+        """
+        return tpool.execute(self.audio_emotion_model.predict_batch, feature_vectors)
+    
+    def _predict_video_batch(self, face_rois):
+        """Run batched video inference on a native thread"""
+        return tpool.execute(self.video_emotion_model.predict_batch, face_rois)
+    
+    def _extract_audio_features(self, audio_array, session_id):
+        """
+        Preprocess an audio chunk and build the emotion model input
+        
+        Args:
+            audio_array: Raw float32 audio samples
+            session_id: Session whose noise profile to use
+            
+        Returns:
+            Feature vector of shape (time_frames, features), or None if the chunk is silence
+        """
+        # Preprocess audio (silent chunks are detected before any processing)
+        processed_audio, is_valid = self.audio_preprocessor.process_audio_chunk(audio_array, session_id)
+        
+        if not is_valid:
+            return None
+        
+        # Extract features
+        features = self.audio_feature_extractor.extract_features(processed_audio)
+        
+        # Get feature vector for model
+        return self.audio_feature_extractor.get_feature_vector_for_model(features)
+    
+    def _prediction_cache(self, session_id, modality):
+        """
+        Get a session's prediction cache for a modality, creating it on first use
+        
+        Args:
+            session_id: Session the input belongs to
+            modality: 'audio' or 'video'
+            
+        Returns:
+            PredictionCache, or None when caching is off or the session is unknown
+        """
+        if config.PREDICTION_CACHE_SIZE <= 0 or session_id is None:
+            return None
+        
+        caches = self._prediction_caches.get(session_id)
+        if caches is None:
+            caches = self._prediction_caches[session_id] = {
+                'audio': PredictionCache(config.PREDICTION_CACHE_SIZE),
+                'video': PredictionCache(config.PREDICTION_CACHE_SIZE)
+            }
+        return caches[modality]
+    
+    def _predict_cached(self, cache, key_fn, batcher, model_input):
+        """
+        Predict through the LRU cache, submitting to the batcher on a miss
+        
+        Args:
+            cache: The session's PredictionCache for the modality (None to skip caching)
+            key_fn: Maps the model input to its cache key
+            batcher: InferenceBatcher for the modality
+            model_input: Single model input
+            
+        Returns:
+            Tuple of (emotion, probabilities, confidence)
+        """
+        if cache is None:
+            return batcher.submit(model_input)
+        
+        key = key_fn(model_input)
+        prediction = cache.get(key)
+        if prediction is None:
+            prediction = batcher.submit(model_input)
+            cache.put(key, prediction)
+        
+        return prediction
+    
+    def get_cache_stats(self):
+        """Get prediction cache counters for both modalities, summed over all sessions"""
+        stats = {'sessions': len(self._prediction_caches)}
+        for modality, retired in self._retired_cache_stats.items():
+            hits, misses, size = retired['hits'], retired['misses'], 0
+            for caches in self._prediction_caches.values():
+                cache = caches[modality]
+                hits += cache.hits
+                misses += cache.misses
+                size += len(cache)
+            lookups = hits + misses
+            stats[modality] = {
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': hits / lookups if lookups else 0.0,
+                'size': size,
+                'capacity_per_session': config.PREDICTION_CACHE_SIZE
+            }
+        return stats
+    
+    def _decode_frame(self, frame_bytes):
+        """
+        Decode a JPEG frame to BGR, downscaled by VIDEO_DECODE_DOWNSCALE during decoding
+        
+        Args:
+            frame_bytes: Encoded image bytes
+            
+        Returns:
+            BGR frame, or None if the bytes could not be decoded
+        """
+        if self._turbojpeg is not None:
+            try:
+                return self._turbojpeg.decode(
+                    frame_bytes,
+                    pixel_format=TJPF_BGR,
+                    scaling_factor=(1, self.decode_downscale)
+                )
+            except Exception:
+                pass  # Not a JPEG libjpeg-turbo can read, let OpenCV try
+        
+        return cv2.imdecode(np.frombuffer(frame_bytes, np.uint8), self._imread_flag)
+    
+    def _detect_face_roi(self, frame, session_id):
+        """
+        Video stage 1: face landmarks and the emotion model input for one frame
+        
+        Args:
+            frame: BGR frame
+            session_id: Session the frame belongs to (keys the landmark reuse anchor)
+            
+        Returns:
+            Tuple of (landmarks, face_roi, prediction); (None, None, None) if no face was found.
+            If freshly detected landmarks barely moved since the session's last prediction,
+            that prediction is returned and the ROI is not extracted (face_roi None)
+        """
+        landmarks, tracked = self.face_detector.track_face_landmarks(frame, session_id)
+        if landmarks is None:
+            return None, None, None
+        
+        # Reused landmarks always match the anchor; the ROI is cropped from this frame's
+        # pixels so the emotion model still sees expression changes between detections
+        anchor = self._prediction_anchor.get(session_id)
+        if anchor is not None and self.landmark_reuse_eps > 0 and not tracked:
+            # RMS displacement of the (x, y) landmarks
+            shift = np.linalg.norm(landmarks[:, :2] - anchor[0][:, :2]) / np.sqrt(len(landmarks))
+            if shift < self.landmark_reuse_eps:
+                return landmarks, None, anchor[1]
+        
+        return landmarks, self.face_detector.extract_face_roi(frame, landmarks), None
+    
     def handle_connect(self, sid):
         """Handle client connection"""
         session_id = self.session_manager.create_session()
-        print(f"Client connected: {sid}, Session: {session_id}")
+        self.sid_to_session[sid] = session_id
+        self._sessions_by_sid[sid] = self.session_manager.get_session(session_id)
+        log.info("Client connected: %s, Session: %s", sid, session_id)
         
         emit('session_created', {
             'session_id': session_id,
-            'message': 'Connected to Worker Stress Analysis System'
+            'message': 'Connected to Worker Stress Analysis System',
+            # Frames at this size and quality keep uploads small and decoding cheap
+            'capture': {
+                'codec': 'mjpeg',
+                'max_width': config.VIDEO_FRAME_WIDTH,
+                'max_height': config.VIDEO_FRAME_HEIGHT,
+                'quality': config.VIDEO_JPEG_QUALITY
+            }
         })
         
         return session_id
     
-    def handle_disconnect(self, sid, session_id):
+    def get_session_id(self, sid):
+        """Get the session_id bound to a Socket.IO SID (None if unknown)"""
+        return self.sid_to_session.get(sid)
+    
+    def handle_disconnect(self, sid):
         """Handle client disconnection"""
-        print(f"Client disconnected: {sid}")
+        log.info("Client disconnected: %s", sid)
+        session_id = self.sid_to_session.pop(sid, None)
+        self._sessions_by_sid.pop(sid, None)
         if session_id:
             self.session_manager.end_session(session_id)
+            self.audio_preprocessor.reset_noise_profile(session_id)
+            self._video_frame_count.pop(session_id, None)
+            self._last_video_result.pop(session_id, None)
+            self._last_audio_result.pop(session_id, None)
+            self._prediction_anchor.pop(session_id, None)
+            self.face_detector.reset_tracking(session_id)
+            caches = self._prediction_caches.pop(session_id, None)
+            if caches is not None:
+                for modality, cache in caches.items():
+                    self._retired_cache_stats[modality]['hits'] += cache.hits
+                    self._retired_cache_stats[modality]['misses'] += cache.misses
+    
+    def _drop_busy(self, inflight, session_id, modality, emit_result):
+        """
+        Backpressure: claim the session's single processing slot for a modality
+        
+        Args:
+            inflight: Set of session IDs with work in flight for the modality
+            session_id: Session the new chunk/frame belongs to
+            modality: 'audio' or 'video', reported to the client
+            emit_result: Tell the client about a drop
+            
+        Returns:
+            True if the slot is busy and the input should be dropped, False if it was claimed
+        """
+        if session_id in inflight:
+            if emit_result:
+                emit('dropped', {'modality': modality, 'message': 'Previous input still processing'})
+            return True
+        
+        inflight.add(session_id)
+        return False
     
-    def handle_audio_chunk(self, data):
+    def handle_audio_chunk(self, sid, data, emit_result=True):
         """
         Process audio chunk from client
         
         Args:
-            data: Dictionary containing audio data and session_id
+            sid: Socket.IO session ID of the client
+            data: Dictionary containing audio data (probs_as_array=True sends
+                emotion_probabilities as a list in EMOTION_LABELS order)
+            emit_result: Emit 'audio_result' to the client (False when fused in the same event)
         """
+        claimed = False
         try:
-            session_id = data.get('session_id')
-            audio_base64 = data.get('audio_data')
+            session_id = self.get_session_id(sid)
             
-            if not audio_base64:
-                return
+            # The client flags chunks it measured as silence and leaves out the payload
+            if data.get('silent'):
+                return None
             
-            # Decode base64 audio to numpy array
-            audio_bytes = base64.b64decode(audio_base64)
-            audio_array = np.frombuffer(audio_bytes, dtype=np.float32)
+            audio_payload = data.get('audio_data')
             
-            # Preprocess audio
-            processed_audio = self.audio_preprocessor.process_audio_chunk(audio_array)
+            if not audio_payload:
+                return
             
-            # Validate audio (check if not silence)
-            if not self.audio_preprocessor.validate_audio_chunk(processed_audio):
-                print("Audio chunk is silence, skipping...")
+            # One chunk in flight per session; drop this one if the last is still processing
+            if self._drop_busy(self._audio_inflight, session_id, 'audio', emit_result):
                 return None
+            claimed = True
+            
+            # View the float32 samples in place (frombuffer, no copy); the client sends raw bytes
+            audio_array = np.frombuffer(_payload_bytes(audio_payload), dtype=np.float32)
             
-            # Extract features
-            features = self.audio_feature_extractor.extract_features(processed_audio)
+            # Preprocess and extract features on a native thread: noise reduction and
+            # librosa take milliseconds per chunk and would otherwise stall every other socket
+            feature_vector = tpool.execute(self._extract_audio_features, audio_array, session_id)
             
-            # Get feature vector for model
-            feature_vector = self.audio_feature_extractor.get_feature_vector_for_model(features)
+            if feature_vector is None:
+                log.debug("Audio chunk is silence, skipping...")
+                return None
             
-            # Predict emotion
-            emotion, emotion_probs, confidence = self.audio_emotion_model.predict(feature_vector)
+            # Predict emotion (cached, else batched with other sessions' chunks)
+            emotion, emotion_probs, confidence = self._predict_cached(
+                self._prediction_cache(session_id, 'audio'), audio_cache_key,
+                self.audio_batcher, feature_vector
+            )
             
             # Calculate stress score
-            stress_score, stress_level, details = self.audio_stress_scorer.calculate_stress_score(
-                emotion, emotion_probs, confidence
+            stress_score, stress_level, _ = self.audio_stress_scorer.calculate_stress_score(
+                emotion, emotion_probs, confidence, with_details=False
             )
             
             # Emit audio result
             audio_result = {
                 'modality': 'audio',
                 'emotion': emotion,
-                'emotion_probabilities': emotion_probs,
+                'emotion_probabilities': _probs_payload(emotion_probs, data.get('probs_as_array', False)),
                 'stress_score': stress_score,
                 'stress_level': stress_level,
                 'confidence': confidence
             }
             
-            emit('audio_result', audio_result)
+            self._last_audio_result[session_id] = audio_result
+            if emit_result:
+                emit('audio_result', audio_result)
             
             return audio_result
             
         except Exception as e:
-            print(f"Error processing audio: {e}")
+            log.error("Error processing audio: %s", e)
             emit('error', {'message': f'Audio processing error: {str(e)}'})
             return None
+        
+        finally:
+            if claimed:
+                self._audio_inflight.discard(session_id)
     
-    def handle_video_frame(self, data):
+    def handle_video_frame(self, sid, data, emit_result=True, fuse=None):
         """
         Process video frame from client
         
         Args:
-            data: Dictionary containing video frame and session_id
+            sid: Socket.IO session ID of the client
+            data: Dictionary containing video frame (probs_as_array=True sends
+                emotion_probabilities as a list in EMOTION_LABELS order; fuse=True also
+                fuses each freshly analyzed face with the session's last audio result)
+            emit_result: Emit 'video_result' to the client (False when fused in the same event)
+            fuse: Override data['fuse'] (False when the caller fuses the result itself)
         """
+        claimed = False
         try:
-            session_id = data.get('session_id')
-            frame_base64 = data.get('frame_data')
+            session_id = self.get_session_id(sid)
+            frame_payload = data.get('frame_data')
             
-            if not frame_base64:
+            if not frame_payload:
                 return
             
-            # Decode base64 image to numpy array
-            frame_bytes = base64.b64decode(frame_base64)
-            nparr = np.frombuffer(frame_bytes, np.uint8)
-            frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            
-            if frame is None:
+            # Between analyzed frames, re-emit the last result without decoding the upload
+            count = self._video_frame_count.get(session_id, 0)
+            self._video_frame_count[session_id] = count + 1
+            last_result = self._last_video_result.get(session_id)
+            if last_result is not None and count % self.video_every_k != 0:
+                stale_result = {**last_result, 'stale': True}
+                if emit_result:
+                    emit('video_result', stale_result)
+                return stale_result
+            
+            # One frame in flight per session; drop this one if the last is still processing
+            if self._drop_busy(self._video_inflight, session_id, 'video', emit_result):
                 return None
+            claimed = True
             
-            # Detect face and landmarks
-            face_detected, landmarks, annotated_frame = self.face_detector.detect_face_and_landmarks(frame)
-            
-            if not face_detected:
-                print("No face detected in frame")
-                emit('video_result', {
-                    'modality': 'video',
-                    'face_detected': False,
-                    'message': 'No face detected'
-                })
+            # Reject oversized uploads before decoding
+            if _payload_size(frame_payload) > config.VIDEO_MAX_FRAME_BYTES:
+                emit('error', {'message': 'Video frame too large, capture at the size sent in session_created'})
                 return None
             
-            # Extract facial features
-            facial_features = self.video_feature_extractor.extract_features(landmarks)
-            
-            # Extract face ROI for emotion model
-            face_roi = self.face_detector.extract_face_roi(frame, landmarks)
+            # Decode the JPEG bytes to a numpy array
+            frame = self._decode_frame(_payload_bytes(frame_payload))
             
-            if face_roi is None:
+            if frame is None:
                 return None
             
-            # Predict emotion
-            emotion, emotion_probs, confidence = self.video_emotion_model.predict(face_roi)
+            # Stage 1: detect face and landmarks, extract face ROI (native thread, one frame at a time)
+            with self._face_stage:
+                landmarks, face_roi, prediction = tpool.execute(self._detect_face_roi, frame, session_id)
+            
+            if landmarks is None:
+                # Don't carry a face result across frames without one
+                self._last_video_result.pop(session_id, None)
+                self._prediction_anchor.pop(session_id, None)
+                log.debug("No face detected in frame")
+                if emit_result:
+                    emit('video_result', {
+                        'modality': 'video',
+                        'face_detected': False,
+                        'message': 'No face detected'
+                    })
+                return None
             
-            # Calculate stress score
-            stress_score, stress_level, details = self.video_stress_scorer.calculate_stress_score(
-                emotion, emotion_probs, confidence, facial_features
+            # Stage 2: predict emotion (batched with other frames, overlaps their Face Mesh),
+            # unless stage 1 found the face still and handed back the last prediction
+            if prediction is None:
+                if face_roi is None:
+                    return None
+                
+                prediction = self._predict_cached(
+                    self._prediction_cache(session_id, 'video'), face_cache_key,
+                    self.video_batcher, face_roi
+                )
+                self._prediction_anchor[session_id] = (landmarks, prediction)
+            
+            emotion, emotion_probs, confidence = prediction
+            
+            # Stage 3: extract facial features and calculate stress score
+            facial_features = self.video_feature_extractor.extract_features(landmarks)
+            stress_score, stress_level, _ = self.video_stress_scorer.calculate_stress_score(
+                emotion, emotion_probs, confidence, facial_features, with_details=False
             )
             
             # Emit video result
             video_result = {
                 'modality': 'video',
                 'face_detected': True,
+                'stale': False,
                 'emotion': emotion,
-                'emotion_probabilities': emotion_probs,
+                'emotion_probabilities': _probs_payload(emotion_probs, data.get('probs_as_array', False)),
                 'stress_score': stress_score,
                 'stress_level': stress_level,
                 'confidence': confidence,
@@ -181,68 +561,160 @@ class WebSocketHandler:
                 }
             }
             
-            emit('video_result', video_result)
+            self._last_video_result[session_id] = video_result
+            if emit_result:
+                emit('video_result', video_result)
+            
+            if fuse is None:
+                fuse = data.get('fuse', False)
+            if fuse:
+                self._fuse_and_emit(
+                    sid, self._last_audio_result.get(session_id), video_result,
+                    data.get('legacy_events', False)
+                )
             
             return video_result
             
         except Exception as e:
-            print(f"Error processing video: {e}")
+            log.error("Error processing video: %s", e)
             emit('error', {'message': f'Video processing error: {str(e)}'})
             return None
+        
+        finally:
+            if claimed:
+                self._video_inflight.discard(session_id)
     
-    def handle_fusion_request(self, data):
+    def handle_fusion_request(self, sid, data):
         """
         Perform multimodal fusion and send final analysis
         
         Args:
-            data: Dictionary containing audio and video results
+            sid: Socket.IO session ID of the client
+            data: Dictionary containing audio and video results (legacy_events=True for
+                separate 'stress_update'/'session_update'/'alert' events instead of 'tick')
         """
         try:
-            session_id = data.get('session_id')
-            audio_result = data.get('audio_result')
-            video_result = data.get('video_result')
-            
-            # Perform fusion
-            fused_result = self.fusion_engine.fuse_stress_scores(audio_result, video_result)
-            
-            # Update session
-            session_info = self.session_manager.update_session(session_id, fused_result)
-            
-            # Check for alerts
-            alerts = self.alert_manager.check_alerts(
-                session_id,
-                fused_result.get('stress_score', 0.5)
+            self._fuse_and_emit(
+                sid, data.get('audio_result'), data.get('video_result'), data.get('legacy_events', False)
             )
             
-            # Emit fused result
-            emit('stress_update', fused_result)
+        except Exception as e:
+            log.error("Error in fusion: %s", e)
+            emit('error', {'message': f'Fusion error: {str(e)}'})
+    
+    def handle_multimodal(self, sid, data):
+        """
+        Process an audio chunk and a video frame in one event and send the fused analysis
+        Saves the client the 'fusion_request' round-trip after 'audio_result'/'video_result'
+        
+        Args:
+            sid: Socket.IO session ID of the client
+            data: Dictionary containing audio_data and/or frame_data; with combined=True
+                only the fused analysis is emitted, not the per-modality results
+        """
+        try:
+            emit_results = not data.get('combined', False)
             
-            # Emit session update
-            emit('session_update', session_info)
+            # Audio runs in its own green thread while this one handles the frame; both
+            # pipelines spend their time on native threads, so they overlap
+            audio_thread = eventlet.spawn(
+                copy_current_request_context(self.handle_audio_chunk), sid, data, emit_results
+            )
+            video_result = self.handle_video_frame(sid, data, emit_results, fuse=False)
+            audio_result = audio_thread.wait()
+            
+            # No frame was sent (the client streams frames through video_frame), or the paired
+            # frame was dropped because that stream has one in flight: fuse with the session's
+            # last face result instead (none after a lost face)
+            if video_result is None:
+                last_result = self._last_video_result.get(self.get_session_id(sid))
+                if last_result is not None:
+                    video_result = {**last_result, 'stale': True}
+            
+            # Nothing new to fuse (silence and no face)
+            if audio_result is None and video_result is None:
+                return None
             
-            # Emit alerts if any
-            if alerts:
-                for alert in alerts:
-                    emit('alert', alert)
+            return self._fuse_and_emit(sid, audio_result, video_result, data.get('legacy_events', False))
             
         except Exception as e:
-            print(f"Error in fusion: {e}")
-            emit('error', {'message': f'Fusion error: {str(e)}'})
+            log.error("Error in multimodal processing: %s", e)
+            emit('error', {'message': f'Multimodal processing error: {str(e)}'})
+            return None
+    
+    def _fuse_and_emit(self, sid, audio_result, video_result, legacy_events=False):
+        """
+        Fuse modality results, record them in the session and emit the analysis
+        
+        Args:
+            sid: Socket.IO session ID of the client
+            audio_result: Audio analysis result (or None)
+            video_result: Video analysis result (or None)
+            legacy_events: Emit separate 'stress_update', 'session_update' and 'alert' events
+                instead of one combined 'tick'
+            
+        Returns:
+            Fused result dictionary
+        """
+        # Perform fusion
+        fused_result = self.fusion_engine.fuse_stress_scores(audio_result, video_result)
+        
+        # Update session (attached record, else by id, which creates one for an unknown SID)
+        session_id = self.get_session_id(sid)
+        session = self._sessions_by_sid.get(sid)
+        if session is not None:
+            session_info = self.session_manager.update_session_record(session, fused_result)
+        else:
+            session_info = self.session_manager.update_session(session_id, fused_result)
+        
+        # Check for alerts
+        alerts = self.alert_manager.check_alerts(
+            session_id,
+            fused_result.get('stress_score', 0.5)
+        )
+        
+        if not legacy_events:
+            # Fused result, session update and alerts in one frame
+            emit('tick', {
+                'stress': fused_result,
+                'session': session_info,
+                'alerts': alerts or []
+            })
+            return fused_result
+        
+        # Emit fused result
+        emit('stress_update', fused_result)
+        
+        # Emit session update
+        emit('session_update', session_info)
+        
+        # Emit alerts if any
+        if alerts:
+            for alert in alerts:
+                emit('alert', alert)
+        
+        return fused_result
     
-    def handle_get_session_info(self, data):
+    def handle_get_session_info(self, sid, data):
         """Get session information"""
-        session_id = data.get('session_id')
-        session_info = self.session_manager.get_session_info(session_id)
+        session = self._sessions_by_sid.get(sid)
         
-        if session_info:
+        if session is not None:
+            session_info = self.session_manager.session_record_info(session)
             emit('session_info', session_info)
         else:
             emit('error', {'message': 'Session not found'})
     
-    def handle_get_timeline(self, data):
+    def handle_get_timeline(self, sid, data):
         """Get stress timeline data"""
-        session_id = data.get('session_id')
+        session = self._sessions_by_sid.get(sid)
         limit = data.get('limit', 100)
         
-        timeline = self.session_manager.get_stress_timeline(session_id, limit)
+        timeline = []
+        if session is not None:
+            try:
+                timeline = self.session_manager.session_record_timeline(session, limit)
+            except (TypeError, ValueError):
+                emit('error', {'message': f'Invalid timeline limit: {limit!r}'})
+                return
         emit('timeline_data', {'timeline': timeline})
@@ -26,8 +26,6 @@ function App() {
     const [alerts, setAlerts] = useState([]);
 
     const videoRef = useRef(null);
-    const audioResultRef = useRef(null);
-    const videoResultRef = useRef(null);
     const videoIntervalRef = useRef(null);
 
     // Initialize WebSocket connection
@@ -39,7 +37,6 @@ function App() {
                 console.log('WebSocket connected');
 
                 // Set up event listeners
-                wsService.on('audio_result', handleAudioResult);
                 wsService.on('video_result', handleVideoResult);
                 wsService.on('stress_update', handleStressUpdate);
                 wsService.on('session_update', handleSessionUpdate);
@@ -58,31 +55,20 @@ function App() {
         };
     }, []);
 
-    const handleAudioResult = (data) => {
-        audioResultRef.current = data;
-        setCurrentEmotion(prev => ({ ...prev, audio: data.emotion }));
-        setAudioLevel(Math.random() * 0.5 + 0.3); // Simulated audio level
-
-        // Request fusion if we have both results
-        if (videoResultRef.current) {
-            wsService.requestFusion(audioResultRef.current, videoResultRef.current);
-        }
-    };
-
     const handleVideoResult = (data) => {
         if (data.face_detected) {
-            videoResultRef.current = data;
             setCurrentEmotion(prev => ({ ...prev, video: data.emotion }));
-
-            // Request fusion if we have both results
-            if (audioResultRef.current) {
-                wsService.requestFusion(audioResultRef.current, videoResultRef.current);
-            }
         }
     };
 
     const handleStressUpdate = (data) => {
         setCurrentStress(data);
+
+        // Audio is analyzed only inside the fused update (no separate audio_result)
+        if (data.audio) {
+            setCurrentEmotion(prev => ({ ...prev, audio: data.audio.emotion }));
+            setAudioLevel(Math.random() * 0.5 + 0.3); // Simulated audio level
+        }
     };
 
     const handleSessionUpdate = (data) => {
@@ -116,17 +102,19 @@ function App() {
     };
 
     const startCapture = () => {
-        // Start audio capture (every 3 seconds)
-        mediaService.startAudioCapture((audioData) => {
-            wsService.sendAudioChunk(audioData);
+        // Start audio capture (every 3 seconds); the server fuses each chunk with the last
+        // analyzed frame and answers with one fused update, so no fusion round-trip
+        mediaService.startAudioCapture((audioData, silent) => {
+            wsService.sendMultimodal(audioData, null, silent, true);
         }, 3000);
 
-        // Start video capture (every 200ms = 5 fps)
-        videoIntervalRef.current = setInterval(() => {
+        // Start video capture (every 200ms = 5 fps); each analyzed frame is fused with the
+        // last audio result on the server, so stress updates arrive at the frame rate
+        videoIntervalRef.current = setInterval(async () => {
             if (videoRef.current) {
-                const frameData = mediaService.captureVideoFrame(videoRef.current);
+                const frameData = await mediaService.captureVideoFrame(videoRef.current, wsService.captureParams);
                 if (frameData) {
-                    wsService.sendVideoFrame(frameData);
+                    wsService.sendVideoFrame(frameData, true);
                 }
             }
         }, 200);
@@ -3,6 +3,9 @@
  * Handles camera and microphone capture
  */
 
+// Mean squared amplitude at or below which an audio chunk is silence (matches backend config)
+const SILENCE_ENERGY_THRESHOLD = 1e-4;
+
 class MediaStreamService {
     constructor() {
         this.audioContext = null;
@@ -49,21 +52,27 @@ class MediaStreamService {
         return this.audioStream;
     }
 
-    captureVideoFrame(videoElement) {
+    async captureVideoFrame(videoElement, captureParams = null) {
         if (!videoElement) return null;
 
+        // Scale down to fit the backend's recommended capture size (never up)
+        const maxWidth = captureParams ? captureParams.max_width : videoElement.videoWidth;
+        const maxHeight = captureParams ? captureParams.max_height : videoElement.videoHeight;
+        const scale = Math.min(1, maxWidth / videoElement.videoWidth, maxHeight / videoElement.videoHeight);
+        const quality = captureParams ? captureParams.quality / 100 : 0.8;
+
         const canvas = document.createElement('canvas');
-        canvas.width = videoElement.videoWidth;
-        canvas.height = videoElement.videoHeight;
+        canvas.width = Math.round(videoElement.videoWidth * scale);
+        canvas.height = Math.round(videoElement.videoHeight * scale);
 
         const ctx = canvas.getContext('2d');
-        ctx.drawImage(videoElement, 0, 0);
+        ctx.drawImage(videoElement, 0, 0, canvas.width, canvas.height);
 
-        // Convert to base64 JPEG
-        const dataUrl = canvas.toDataURL('image/jpeg', 0.8);
-        const base64 = dataUrl.split(',')[1];
+        // Encode to JPEG bytes (sent as a binary MessagePack field, no base64)
+        const blob = await new Promise(resolve => canvas.toBlob(resolve, 'image/jpeg', quality));
+        if (!blob) return null;
 
-        return base64;
+        return new Uint8Array(await blob.arrayBuffer());
     }
 
     startAudioCapture(onAudioData, chunkDuration = 3000) {
@@ -90,8 +99,13 @@ class MediaStreamService {
             const now = Date.now();
             if (now - lastSendTime >= chunkDuration) {
                 const chunk = new Float32Array(audioBuffer);
-                const base64 = this.arrayBufferToBase64(chunk.buffer);
-                onAudioData(base64);
+
+                // Silent chunks are flagged instead of encoded and uploaded
+                if (this.isSilent(chunk)) {
+                    onAudioData(null, true);
+                } else {
+                    onAudioData(new Uint8Array(chunk.buffer), false);
+                }
 
                 // Reset buffer
                 audioBuffer = [];
@@ -118,14 +132,12 @@ class MediaStreamService {
         this.isCapturing = false;
     }
 
-    arrayBufferToBase64(buffer) {
-        let binary = '';
-        const bytes = new Uint8Array(buffer);
-        const len = bytes.byteLength;
-        for (let i = 0; i < len; i++) {
-            binary += String.fromCharCode(bytes[i]);
+    isSilent(samples) {
+        let energy = 0;
+        for (let i = 0; i < samples.length; i++) {
+            energy += samples[i] * samples[i];
         }
-        return btoa(binary);
+        return energy <= SILENCE_ENERGY_THRESHOLD * samples.length;
     }
 
     stopAllStreams() {
@@ -3,6 +3,7 @@
  * Manages real-time connection to backend
  */
 import { io } from 'socket.io-client';
+import msgpackParser from 'socket.io-msgpack-parser';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL || 'http://localhost:5000';
 
@@ -10,6 +11,7 @@ class WebSocketService {
     constructor() {
         this.socket = null;
         this.sessionId = null;
+        this.captureParams = null;
         this.connected = false;
         this.eventHandlers = {};
     }
@@ -22,7 +24,8 @@ class WebSocketService {
                 transports: ['websocket', 'polling'],
                 reconnection: true,
                 reconnectionAttempts: 5,
-                reconnectionDelay: 1000
+                reconnectionDelay: 1000,
+                parser: msgpackParser  // Must match SOCKET_SERIALIZER on the backend
             });
 
             this.socket.on('connect', () => {
@@ -33,6 +36,7 @@ class WebSocketService {
 
             this.socket.on('session_created', (data) => {
                 this.sessionId = data.session_id;
+                this.captureParams = data.capture || null;
                 console.log('Session created:', this.sessionId);
             });
 
@@ -83,6 +87,13 @@ class WebSocketService {
             this.emit('alert', data);
         });
 
+        // Fused stress update, session update and alerts in one event
+        this.socket.on('tick', (data) => {
+            this.emit('stress_update', data.stress);
+            this.emit('session_update', data.session);
+            data.alerts.forEach((alert) => this.emit('alert', alert));
+        });
+
         // Timeline data
         this.socket.on('timeline_data', (data) => {
             this.emit('timeline_data', data);
@@ -113,31 +124,29 @@ class WebSocketService {
         }
     }
 
-    sendAudioChunk(audioData) {
-        if (!this.connected || !this.socket) return;
-
-        this.socket.emit('audio_chunk', {
-            session_id: this.sessionId,
-            audio_data: audioData  // Base64 encoded
-        });
-    }
-
-    sendVideoFrame(frameData) {
+    sendVideoFrame(frameData, fuse = false) {
         if (!this.connected || !this.socket) return;
 
+        // With fuse the server also fuses each analyzed frame with the session's last
+        // audio result and answers with a tick
         this.socket.emit('video_frame', {
             session_id: this.sessionId,
-            frame_data: frameData  // Base64 encoded
+            frame_data: frameData,  // JPEG bytes (Uint8Array)
+            fuse: fuse
         });
     }
 
-    requestFusion(audioResult, videoResult) {
+    sendMultimodal(audioData, frameData = null, silent = false, combined = false) {
         if (!this.connected || !this.socket) return;
 
-        this.socket.emit('fusion_request', {
+        // Server analyzes both; with combined it answers with a single tick and no
+        // per-modality results (matches the backend's combined=False default)
+        this.socket.emit('multimodal', {
             session_id: this.sessionId,
-            audio_result: audioResult,
-            video_result: videoResult
+            audio_data: silent ? null : audioData,  // Raw float32 PCM bytes (Uint8Array)
+            silent: silent,
+            frame_data: frameData,  // JPEG bytes (Uint8Array); null fuses with the last frame's result
+            combined: combined
         });
     }
 